@@ -1,9 +1,119 @@
-from django.contrib import admin
-from .models import PdfStorage, Prog, Region, District, ObjectType, WorkType, Arxiv
-
-admin.site.register(PdfStorage)
-admin.site.register(Prog)
-admin.site.register(Region)
-admin.site.register(District)
-admin.site.register(ObjectType)
-admin.site.register(Arxiv)
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.core.paginator import Paginator
+from django.template.response import TemplateResponse
+from django.utils.functional import cached_property
+
+from .bulk import bulk_edit
+from .forms import ArxivBulkForm
+from .models import PdfStorage, Prog, Region, District, ObjectType, WorkType, Arxiv, Job
+
+
+# дальше этого числа строк admin не считает (и не листает) — нужен фильтр или поиск
+ADMIN_COUNT_MAX = getattr(settings, "ARXIV_ADMIN_COUNT_MAX", 10000)
+
+
+class CappedCountPaginator(Paginator):
+    # по count считаются страницы, поэтому только точный COUNT — но не дальше ADMIN_COUNT_MAX строк
+    @cached_property
+    def count(self):
+        return self.object_list.order_by().values("pk")[:ADMIN_COUNT_MAX].count()
+
+
+@admin.register(PdfStorage)
+class PdfStorageAdmin(admin.ModelAdmin):
+    list_display = ("id", "file_name", "file_size", "page_count", "storage", "codec", "ref_count", "sha256", "uploaded_by", "created_at")
+    list_filter = ("storage", "codec")
+    list_select_related = ("uploaded_by",)
+    search_fields = ("file_name", "=sha256")
+    readonly_fields = ("file_size", "page_count", "sha256", "codec", "storage", "ref_count", "orphaned_at", "created_at")
+    autocomplete_fields = ("uploaded_by",)
+    ordering = ("-id",)
+    show_full_result_count = False
+    paginator = CappedCountPaginator
+
+    def get_queryset(self, request):
+        # content (LONGBLOB) не выбираем ни в списке, ни в форме, ни в автодополнении
+        return super().get_queryset(request).metadata()
+
+
+# справочники — с поиском, чтобы работали autocomplete_fields в ArxivAdmin
+@admin.register(Prog)
+class ProgAdmin(admin.ModelAdmin):
+    search_fields = ("prog_name",)
+
+
+@admin.register(Region)
+class RegionAdmin(admin.ModelAdmin):
+    search_fields = ("name",)
+
+
+@admin.register(District)
+class DistrictAdmin(admin.ModelAdmin):
+    list_display = ("name", "region")
+    list_filter = ("region",)
+    list_select_related = ("region",)
+    search_fields = ("name",)
+    autocomplete_fields = ("region",)
+
+
+@admin.register(ObjectType)
+class ObjectTypeAdmin(admin.ModelAdmin):
+    search_fields = ("name",)
+
+
+@admin.register(Arxiv)
+class ArxivAdmin(admin.ModelAdmin):
+    list_display = ("reg_num", "reg_date", "customer", "prog", "region", "district", "object_type", "is_mutch", "pdf_name")
+    list_filter = ("is_mutch", "region")
+    list_select_related = ("prog", "region", "district", "object_type", "pdf")
+    # ^ — LIKE 'q%': работают индексы по reg_num и customer
+    search_fields = ("^reg_num", "^customer")
+    autocomplete_fields = ("prog", "region", "district", "object_type", "pdf")
+    date_hierarchy = "reg_date"  # индекс arxiv(reg_date)
+    list_per_page = 50
+    show_full_result_count = False
+    paginator = CappedCountPaginator
+    actions = ["bulk_edit"]
+
+    def get_queryset(self, request):
+        # справочники и PDF — одним JOIN, но без BLOB. select_related задаём здесь:
+        # если он уже есть в queryset, ChangeList свой list_select_related не применяет
+        return super().get_queryset(request).select_related(*self.list_select_related).defer("pdf__content")
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        # иначе проверка выбранного pdf тянет BLOB из pdf_storage
+        if db_field.name == "pdf":
+            kwargs["queryset"] = PdfStorage.objects.metadata()
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    @admin.action(description="Массовое изменение полей", permissions=["change"])
+    def bulk_edit(self, request, queryset):
+        # как delete_selected: сначала страница с формой, затем тот же action с данными формы
+        data = request.POST if "apply_bulk_edit" in request.POST else None
+        form = ArxivBulkForm(data, queryset=queryset)
+        if form.is_bound and form.is_valid():
+            updated = bulk_edit(queryset, form.changes())
+            self.message_user(request, f"Изменено записей: {updated}.", messages.SUCCESS)
+            return None
+        return TemplateResponse(request, "admin/arxiv/arxiv/bulk_edit.html", {
+            **self.admin_site.each_context(request),
+            "title": "Массовое изменение",
+            "opts": self.model._meta,
+            "form": form,
+            "count": queryset.count(),
+            "selected": request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            "select_across": request.POST.get("select_across") == "1",
+            "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+        })
+
+    @admin.display(description="PDF", ordering="pdf__file_name")
+    def pdf_name(self, obj):
+        return obj.pdf.file_name if obj.pdf_id else "—"
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "object_id", "status", "attempts", "run_after", "locked_by")
+    list_filter = ("status", "kind")
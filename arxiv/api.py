@@ -0,0 +1,255 @@
+"""
+JSON API для скриптов филиалов (вместо разбора HTML arxiv_list).
+
+GET  api/arxiv/?fields=reg_num,region,pdf&q=...&cursor=...&limit=50 — список (keyset-курсор)
+GET  api/arxiv/<id>/?fields=...                                     — одна запись
+GET  api/pdf/<id>/                                                  — метаданные PDF (без content)
+POST api/arxiv/batch/         {"items": [{...}, ...]}                — создать пачку
+POST api/arxiv/batch/update/  {"items": [{"id": 1, ...}, ...]}       — изменить пачку
+
+Запись в пачке проверяется ArxivForm (включая район/область) и пишется в одной
+транзакции: либо все, либо ни одной. Справочники — по id. Авторизация — сессия
+или HTTP Basic; при Basic CSRF не нужен.
+"""
+import base64
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.db import IntegrityError, transaction
+from django.forms.models import model_to_dict
+from django.http import JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from .filters import MAX_ID, filter_arxiv, list_ordering
+from .forms import ArxivForm
+from .models import Arxiv, PdfStorage
+from .pagination import paginate_keyset
+from .routing import replica_reads
+
+PAGE_SIZE = getattr(settings, "ARXIV_API_PAGE_SIZE", 50)
+MAX_PAGE_SIZE = getattr(settings, "ARXIV_API_MAX_PAGE_SIZE", 500)
+MAX_BATCH = getattr(settings, "ARXIV_API_MAX_BATCH", 500)
+
+SCALAR_FIELDS = [
+    "reg_num", "reg_date", "customer", "object_name", "work_type",
+    "signed_person", "branch_manager", "specialist", "is_mutch", "book_number",
+    "created_at", "updated_at",
+]
+# справочник -> поле с названием
+LOOKUP_FIELDS = {
+    "prog": "prog_name",
+    "region": "name",
+    "district": "name",
+    "object_type": "name",
+}
+PDF_FIELDS = ["file_name", "mime_type", "file_size", "sha256", "page_count", "created_at"]
+
+API_FIELDS = SCALAR_FIELDS + list(LOOKUP_FIELDS) + ["pdf"]
+
+
+# --- авторизация ---
+
+def _basic_user(request):
+    header = request.META.get("HTTP_AUTHORIZATION", "")
+    if not header.startswith("Basic "):
+        return None
+    try:
+        username, _, password = base64.b64decode(header[6:]).decode().partition(":")
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return authenticate(request, username=username, password=password)
+
+
+def _csrf_failed(request):
+    # для сессии — обычная проверка CSRF, как у форм
+    check = CsrfViewMiddleware(lambda req: None)
+    check.process_request(request)
+    return check.process_view(request, None, (), {}) is not None
+
+
+def api_view(view):
+    """Сессия или HTTP Basic; вместо редиректа на логин — 401 JSON."""
+
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        user = _basic_user(request)
+        if user is not None:
+            request.user = user
+        elif not request.user.is_authenticated:
+            return JsonResponse({"error": "authentication required"}, status=401)
+        elif request.method not in ("GET", "HEAD", "OPTIONS") and _csrf_failed(request):
+            return JsonResponse({"error": "CSRF check failed"}, status=403)
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+# --- сериализация ---
+
+def parse_fields(value):
+    if not value:
+        return list(API_FIELDS)
+    fields = [f.strip() for f in value.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in API_FIELDS]
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def api_queryset(fields):
+    # только нужные колонки и JOIN'ы — одна выборка без BLOB
+    related = [f for f in fields if f in LOOKUP_FIELDS]
+    # ключи сортировки (filters.SORTS) нужны курсору, даже если их не запросили
+    only = ["id", "reg_num", "reg_date", "customer"] + [f for f in fields if f in SCALAR_FIELDS]
+    for name in related:
+        only += [name, f"{name}__id", f"{name}__{LOOKUP_FIELDS[name]}"]
+    if "pdf" in fields:
+        related.append("pdf")
+        only += ["pdf", "pdf__id"] + [f"pdf__{f}" for f in PDF_FIELDS]
+    return Arxiv.objects.select_related(*related).only(*only)
+
+
+def pdf_data(pdf):
+    if pdf is None:
+        return None
+    data = {"id": pdf.id}
+    for name in PDF_FIELDS:
+        data[name] = getattr(pdf, name)
+    return data
+
+
+def arxiv_data(arxiv, fields):
+    data = {"id": arxiv.id}
+    for name in fields:
+        if name in LOOKUP_FIELDS:
+            obj = getattr(arxiv, name)
+            data[name] = {"id": obj.id, "name": getattr(obj, LOOKUP_FIELDS[name])}
+        elif name == "pdf":
+            data[name] = pdf_data(arxiv.pdf)
+        else:
+            data[name] = getattr(arxiv, name)
+    return data
+
+
+def _limit(value):
+    try:
+        return max(1, min(int(value), MAX_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return PAGE_SIZE
+
+
+# --- чтение ---
+
+@api_view
+@require_GET
+@replica_reads
+def arxiv_list(request):
+    try:
+        fields = parse_fields(request.GET.get("fields"))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    qs, filters = filter_arxiv(api_queryset(fields), request.GET)
+    page = paginate_keyset(qs, list_ordering(qs, filters), request.GET.get("cursor"), _limit(request.GET.get("limit")))
+    return JsonResponse({
+        "results": [arxiv_data(a, fields) for a in page],
+        "next": page.next_cursor,
+        "previous": page.prev_cursor,
+    })
+
+
+@api_view
+@require_GET
+@replica_reads
+def arxiv_detail(request, pk):
+    try:
+        fields = parse_fields(request.GET.get("fields"))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    arxiv = api_queryset(fields).filter(pk=pk).first()
+    if arxiv is None:
+        return JsonResponse({"error": "not found"}, status=404)
+    return JsonResponse(arxiv_data(arxiv, fields))
+
+
+@api_view
+@require_GET
+@replica_reads
+def pdf_detail(request, pdf_id):
+    pdf = PdfStorage.objects.metadata().filter(id=pdf_id).first()
+    if pdf is None:
+        return JsonResponse({"error": "not found"}, status=404)
+    return JsonResponse(pdf_data(pdf))
+
+
+# --- запись пачками ---
+
+def _read_items(request):
+    try:
+        payload = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("invalid JSON")
+    items = payload.get("items") if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not all(isinstance(i, dict) for i in items):
+        raise ValueError('expected {"items": [{...}, ...]}')
+    if len(items) > MAX_BATCH:
+        raise ValueError(f"at most {MAX_BATCH} items per request")
+    return items
+
+
+def _save_batch(forms):
+    errors = {i: form.errors.get_json_data() for i, form in enumerate(forms) if not form.is_valid()}
+    if errors:
+        return JsonResponse({"errors": errors}, status=400)
+
+    try:
+        with transaction.atomic():
+            saved = [form.save() for form in forms]
+    except IntegrityError as e:
+        # например, одинаковый reg_num внутри пачки
+        return JsonResponse({"error": str(e)}, status=409)
+
+    return JsonResponse({"results": [{"id": a.id, "reg_num": a.reg_num} for a in saved]})
+
+
+@api_view
+@require_POST
+def arxiv_batch_create(request):
+    try:
+        items = _read_items(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return _save_batch([ArxivForm(data=item) for item in items])
+
+
+@api_view
+@require_POST
+def arxiv_batch_update(request):
+    try:
+        items = _read_items(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    ids = [item.get("id") for item in items]
+    # bool — тоже int (True == 1), а id вне BIGINT драйвер БД не примет
+    invalid = {i: "invalid id" for i, pk in enumerate(ids) if type(pk) is not int or not 1 <= pk <= MAX_ID}
+    instances = Arxiv.objects.in_bulk([pk for i, pk in enumerate(ids) if i not in invalid])
+    errors = {i: "not found" for i, pk in enumerate(ids) if i not in invalid and pk not in instances}
+    errors.update(invalid)
+    if errors:
+        return JsonResponse({"errors": dict(sorted(errors.items()))}, status=400)
+
+    forms = []
+    for item in items:
+        # частичное обновление: недостающие поля — из текущей записи
+        arxiv = instances[item["id"]]
+        data = model_to_dict(arxiv, fields=ArxivForm._meta.fields)
+        data.update({k: v for k, v in item.items() if k != "id"})
+        forms.append(ArxivForm(data=data, instance=arxiv))
+    return _save_batch(forms)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ArxivConfig(AppConfig):
     name = 'arxiv'
+
+    def ready(self):
+        from . import signals  # noqa: F401
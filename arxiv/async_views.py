@@ -0,0 +1,44 @@
+"""
+Асинхронные версии тяжёлых view для запуска под ASGI (uvicorn, см. mysite/asgi.py).
+
+PDF отдаётся асинхронным итератором: пока кусок читается из БД или с диска,
+процесс обслуживает другие запросы. Под WSGI не используются — там Django
+собрал бы асинхронный поток в память целиком.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import aget_object_or_404
+
+from .lookups import districts_for_region
+from .models import PdfStorage
+from .routing import replica_reads
+from .streaming import pdf_response
+from .views import districts_response
+
+
+@login_required
+@replica_reads
+async def pdf_view(request, pdf_id):
+    pdf = await aget_object_or_404(PdfStorage.objects.metadata(), id=pdf_id)
+    return pdf_response(request, pdf, "inline", use_async=True)
+
+
+@login_required
+@replica_reads
+async def pdf_download(request, pdf_id: int):
+    pdf = await aget_object_or_404(PdfStorage.objects.metadata(), id=pdf_id)
+    return pdf_response(request, pdf, "attachment", use_async=True)
+
+
+@login_required
+@replica_reads
+async def districts_by_region(request):
+    region_id = request.GET.get("region_id")
+    try:
+        region_id = int(region_id)
+    except (TypeError, ValueError):
+        return districts_response(request, [])
+
+    # справочник обычно уже в памяти; если нет — загрузка в потоке
+    districts = await sync_to_async(districts_for_region)(region_id)
+    return districts_response(request, districts)
@@ -0,0 +1,63 @@
+"""
+Массовые операции над Arxiv в обход сигналов.
+
+bulk_create и QuerySet.update не шлют post_save — всё, что для одиночной записи
+делают сигналы (arxiv/signals.py), здесь выполняется одним проходом на всю пачку.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Arxiv
+from .pagecache import bump_generation
+from .refs import add_refs
+from .search import FIELDS as SEARCH_FIELDS, index_field, index_new
+from .stats import STAT_FIELDS, apply_changes, apply_delta, stat_key, stat_rows
+
+# больше записей за раз массово не меняем (ids держатся в памяти и уходят в IN (...))
+BULK_EDIT_MAX = getattr(settings, "ARXIV_BULK_EDIT_MAX", 5000)
+
+
+def after_bulk_create(reg_nums):
+    # id берём из БД: MySQL не возвращает их из bulk_create
+    inserted = Arxiv.objects.filter(reg_num__in=reg_nums)
+    index_new(inserted.only("id", "reg_num", "book_number", "customer", "object_name"))
+    apply_changes([], [stat_key(row) for row in stat_rows(inserted)])
+    add_refs(inserted)
+    bump_generation()
+
+
+def bulk_edit(qs, changes):
+    """
+    Ставит всем записям qs значения changes ({поле: значение}, как в cleaned_data
+    ArxivForm) одним UPDATE. Возвращает число изменённых записей.
+    """
+    values = {Arxiv._meta.get_field(name).attname: getattr(value, "pk", value) for name, value in changes.items()}
+
+    with transaction.atomic():
+        # id — заранее: после UPDATE записи могут перестать подходить под фильтр qs
+        ids = list(qs.order_by().values_list("pk", flat=True))
+        if not ids:
+            return 0
+        rows = Arxiv.objects.filter(pk__in=ids)
+        list(rows.select_for_update().values_list("pk", flat=True))
+
+        # статистика: группы "до" переезжают в группы "после" целиком
+        delta = Counter()
+        if set(values) & set(STAT_FIELDS):
+            for row in rows.order_by().values(*STAT_FIELDS).annotate(n=Count("pk")):
+                n = row.pop("n")
+                delta[stat_key(row)] -= n
+                delta[stat_key({**row, **values})] += n
+
+        updated = rows.update(**values, updated_at=timezone.now())
+
+        for key, n in delta.items():
+            apply_delta(key, n)
+        for name in changes.keys() & SEARCH_FIELDS.keys():
+            index_field(ids, name, changes[name])
+        bump_generation()
+    return updated
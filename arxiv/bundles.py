@@ -0,0 +1,67 @@
+import csv
+import re
+import zipfile
+
+from .exports import EXPORT_COLUMNS, Echo, csv_values, export_header
+from .models import PdfStorage
+from .pagination import iter_by_id
+from .storage import backend_for
+from .zipstream import StreamBuffer
+
+BUNDLE_CHUNK_SIZE = 500
+FLUSH_AT = 256 * 1024
+
+UNSAFE_NAME_RE = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+
+
+def bundle_path(pdf_id, file_name):
+    # имя внутри архива по id PDF: одинаковые файлы (один sha256) — одна запись
+    name = UNSAFE_NAME_RE.sub("_", file_name or "document.pdf").strip() or "document.pdf"
+    return f"pdf/{pdf_id}_{name}"
+
+
+def manifest_rows(qs):
+    paths = ["id"] + [path for _, path in EXPORT_COLUMNS] + ["pdf_id", "pdf__file_name"]
+    values = qs.values_list(*paths)
+    for row in iter_by_id(values, BUNDLE_CHUNK_SIZE, key=lambda r: r[0]):
+        *fields, pdf_id, file_name = row[1:]
+        yield fields + [bundle_path(pdf_id, file_name) if pdf_id else ""]
+
+
+def bundle_stream(qs):
+    """
+    ZIP со всеми PDF выборки + manifest.csv со строками Arxiv.
+    PDF читаются из хранилища кусками и сразу пишутся в поток ответа.
+    """
+    buf = StreamBuffer()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        # 1) манифест — отдельным проходом, без BLOB
+        writer = csv.writer(Echo())
+        with zf.open("manifest.csv", "w", force_zip64=True) as f:
+            f.write("\ufeff".encode())  # BOM для Excel
+            f.write(writer.writerow(export_header() + ["PDF"]).encode())
+            for row in manifest_rows(qs):
+                f.write(writer.writerow(csv_values(row)).encode())
+                if buf.pending >= FLUSH_AT:
+                    yield buf.drain()
+        yield buf.drain()
+
+        # 2) сами PDF, каждый sha256 — один раз
+        pdfs = PdfStorage.objects.db_manager(qs.db).metadata().filter(id__in=qs.values("pdf_id"))
+        seen = set()
+        for pdf in iter_by_id(pdfs, BUNDLE_CHUNK_SIZE):
+            key = pdf.sha256 or pdf.pk
+            if key in seen:
+                continue
+            seen.add(key)
+
+            info = zipfile.ZipInfo(bundle_path(pdf.pk, pdf.file_name), pdf.created_at.timetuple()[:6])
+            info.compress_type = zipfile.ZIP_STORED  # PDF и так сжат
+            with zf.open(info, "w", force_zip64=True) as f:
+                if pdf.file_size:
+                    for chunk in backend_for(pdf).iter_chunks(pdf, 0, pdf.file_size - 1):
+                        f.write(chunk)
+                        if buf.pending >= FLUSH_AT:
+                            yield buf.drain()
+            yield buf.drain()
+    yield buf.drain()
@@ -0,0 +1,129 @@
+"""
+Сжатие BLOB в pdf_storage.content (zlib/lzma из stdlib).
+
+Сжатие включается настройкой ARXIV_PDF_CODECS (по умолчанию выключено)
+и применяется к конкретному PDF, только если экономит не меньше
+ARXIV_PDF_COMPRESS_MIN_SAVING (сканы в JPEG почти не сжимаются — такие храним как есть). Кодек пишется
+в PdfStorage.codec, file_size и sha256 всегда относятся к исходному файлу.
+Сжимается потоком по кускам загрузки, всеми кодеками-кандидатами сразу.
+При отдаче BLOB читается кусками и распаковывается потоком. Распаковать
+можно только с начала, поэтому Range для сжатых PDF не поддерживается —
+они отдаются целиком (см. DatabaseBlobStorage.supports_range).
+"""
+import lzma
+import zlib
+
+from django.conf import settings
+
+CODECS = getattr(settings, "ARXIV_PDF_CODECS", [])
+MIN_SAVING = getattr(settings, "ARXIV_PDF_COMPRESS_MIN_SAVING", 0.05)
+
+COMPRESSORS = {
+    "zlib": lambda: zlib.compressobj(6),
+    "lzma": lambda: lzma.LZMACompressor(preset=6),
+}
+DECOMPRESSORS = {
+    "zlib": zlib.decompressobj,
+    "lzma": lzma.LZMADecompressor,
+}
+
+
+def compress_chunks(chunks, codecs=None, min_saving=None):
+    """
+    (codec, сжатые данные) для потока кусков или ("", None), если выигрыш мал —
+    тогда исходник хранится как есть. Исходные куски не накапливаются:
+    в памяти только сжатые варианты.
+    """
+    codecs = CODECS if codecs is None else codecs
+    min_saving = MIN_SAVING if min_saving is None else min_saving
+    if not codecs:
+        return "", None
+    packers = {codec: COMPRESSORS[codec]() for codec in codecs}
+    packed = {codec: [] for codec in codecs}
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+        for codec, packer in packers.items():
+            packed[codec].append(packer.compress(chunk))
+
+    best_codec, best = "", None
+    for codec, packer in packers.items():
+        packed[codec].append(packer.flush())
+        data = b"".join(packed.pop(codec))
+        if best is None or len(data) < len(best):
+            best_codec, best = codec, data
+    if len(best) > size * (1 - min_saving):
+        return "", None
+    return best_codec, best
+
+
+def compress_best(data, codecs=None, min_saving=None):
+    """(codec, данные): самый компактный вариант или ("", data), если выигрыш мал."""
+    codec, packed = compress_chunks([data], codecs, min_saving)
+    return (codec, packed) if codec else ("", data)
+
+
+def _drain(d, data, max_length):
+    # распаковка порциями не больше max_length — в памяти не весь PDF
+    out = d.decompress(data, max_length)
+    while True:
+        if out:
+            yield out
+        tail = getattr(d, "unconsumed_tail", b"")  # zlib
+        if tail:
+            out = d.decompress(tail, max_length)
+        elif isinstance(d, lzma.LZMADecompressor) and not d.needs_input and not d.eof:
+            out = d.decompress(b"", max_length)
+        else:
+            return
+
+
+def iter_decompressed(codec, chunks, chunk_size):
+    d = DECOMPRESSORS[codec]()
+    for data in chunks:
+        yield from _drain(d, data, chunk_size)
+    if hasattr(d, "flush"):
+        tail = d.flush()
+        if tail:
+            yield tail
+
+
+async def aiter_decompressed(codec, chunks, chunk_size):
+    d = DECOMPRESSORS[codec]()
+    async for data in chunks:
+        for out in _drain(d, data, chunk_size):
+            yield out
+    if hasattr(d, "flush"):
+        tail = d.flush()
+        if tail:
+            yield tail
+
+
+def _cut(chunk, pos, start, end):
+    # часть chunk (начинается с позиции pos), попадающая в [start, end]
+    lo = max(start - pos, 0)
+    hi = min(end - pos + 1, len(chunk))
+    return chunk[lo:hi] if lo < hi else b""
+
+
+def slice_stream(chunks, start, end):
+    """Байты [start, end] распакованного потока (для Range по сжатому BLOB)."""
+    pos = 0
+    for chunk in chunks:
+        part = _cut(chunk, pos, start, end)
+        if part:
+            yield part
+        pos += len(chunk)
+        if pos > end:
+            return
+
+
+async def aslice_stream(chunks, start, end):
+    pos = 0
+    async for chunk in chunks:
+        part = _cut(chunk, pos, start, end)
+        if part:
+            yield part
+        pos += len(chunk)
+        if pos > end:
+            return
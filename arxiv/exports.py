@@ -0,0 +1,139 @@
+import csv
+import zipfile
+from itertools import chain
+from xml.sax.saxutils import escape
+
+from .models import Arxiv
+from .pagination import iter_by_id
+from .zipstream import StreamBuffer
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (поле модели для заголовка, путь в values_list)
+EXPORT_COLUMNS = [
+    ("reg_num", "reg_num"),
+    ("reg_date", "reg_date"),
+    ("customer", "customer"),
+    ("prog", "prog__prog_name"),
+    ("region", "region__name"),
+    ("district", "district__name"),
+    ("object_type", "object_type__name"),
+    ("object_name", "object_name"),
+    ("work_type", "work_type"),
+    ("signed_person", "signed_person"),
+    ("branch_manager", "branch_manager"),
+    ("specialist", "specialist"),
+    ("is_mutch", "is_mutch"),
+    ("book_number", "book_number"),
+]
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def export_header():
+    return [str(Arxiv._meta.get_field(name).verbose_name) for name, _ in EXPORT_COLUMNS]
+
+
+def export_rows(qs):
+    """
+    Строки для экспорта. Справочники — через JOIN в том же запросе,
+    читаем пачками по id (keyset): MySQL-драйвер буферизует весь результат
+    даже с .iterator(), а так в памяти только одна пачка.
+    """
+    paths = ["id"] + [path for _, path in EXPORT_COLUMNS]
+    values = qs.values_list(*paths)
+    for row in iter_by_id(values, EXPORT_CHUNK_SIZE, key=lambda r: r[0]):
+        yield row[1:]
+
+
+class Echo:
+    # csv.writer пишет в "файл", который просто возвращает строку
+    def write(self, value):
+        return value
+
+
+def csv_values(row):
+    return ["ha" if v is True else "yo'q" if v is False else v for v in row]
+
+
+def csv_stream(rows):
+    writer = csv.writer(Echo())
+    yield "\ufeff"  # BOM — чтобы Excel понял UTF-8 (кириллица, o‘)
+    yield writer.writerow(export_header())
+    for row in rows:
+        yield writer.writerow(csv_values(row))
+
+
+# --- минимальный XLSX (SpreadsheetML) без сторонних библиотек ---
+
+XLSX_STATIC = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Arxiv" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+SHEET_TAIL = "</sheetData></worksheet>"
+
+# управляющие символы запрещены в XML
+XML_ILLEGAL = dict.fromkeys(c for c in range(32) if c not in (9, 10, 13))
+
+
+def _cell(value):
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, int):
+        return f"<c><v>{value}</v></c>"
+    text = escape(str("" if value is None else value).translate(XML_ILLEGAL))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def xlsx_stream(rows, flush_at=64 * 1024):
+    buf = StreamBuffer()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in XLSX_STATIC.items():
+            zf.writestr(name, data)
+        yield buf.drain()
+
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(SHEET_HEAD.encode())
+            for row in chain([export_header()], rows):
+                sheet.write(("<row>" + "".join(_cell(v) for v in row) + "</row>").encode())
+                if buf.pending >= flush_at:
+                    yield buf.drain()
+            sheet.write(SHEET_TAIL.encode())
+    yield buf.drain()
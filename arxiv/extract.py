@@ -0,0 +1,96 @@
+"""
+Извлечение текста, числа страниц и метаданных из PDF (фоновая задача "pdf_text").
+
+Если установлен pypdf — используем его. Иначе простой разбор на stdlib:
+страницы по /Type /Page, текст из операторов Tj/TJ в (Flate-)потоках,
+метаданные из словаря /Info. Сканы без текстового слоя дают пустой текст.
+"""
+import re
+import zlib
+
+from django.db import transaction
+
+from .models import PdfSearchToken, PdfStorage, PdfText
+from .search import split_words
+from .storage import open_blob
+
+MAX_TEXT = 2 * 1024 * 1024  # символов текста на один PDF
+META_KEYS = ("Title", "Author", "Subject", "Keywords", "Creator", "Producer", "CreationDate", "ModDate")
+
+
+def extract_pdf_text(pdf_id):
+    pdf = PdfStorage.objects.metadata().filter(pk=pdf_id).first()
+    if pdf is None:
+        return  # PDF уже удалили
+
+    with open_blob(pdf) as f:
+        text, page_count, meta = extract(f)
+    text = text[:MAX_TEXT]
+    words = {w[:64] for w in split_words(text) if len(w) >= 2}
+
+    with transaction.atomic():
+        PdfText.objects.update_or_create(
+            pdf_id=pdf_id,
+            defaults={"text": text, "page_count": page_count, "meta": meta},
+        )
+        PdfSearchToken.objects.filter(pdf_id=pdf_id).delete()
+        PdfSearchToken.objects.bulk_create(
+            [PdfSearchToken(pdf_id=pdf_id, token=w) for w in words], batch_size=5000,
+        )
+        PdfStorage.objects.filter(pk=pdf_id).update(page_count=page_count)
+
+
+def extract(f):
+    try:
+        import pypdf
+    except ImportError:
+        return extract_simple(f.read())
+
+    reader = pypdf.PdfReader(f)
+    text = "\n".join(page.extract_text() or "" for page in reader.pages)
+    meta = {k.lstrip("/"): str(v) for k, v in (reader.metadata or {}).items() if k.lstrip("/") in META_KEYS}
+    return text, len(reader.pages), meta
+
+
+# --- разбор без сторонних библиотек ---
+
+STREAM_RE = re.compile(rb"<<(.*?)>>\s*stream\r?\n(.*?)\r?\nendstream", re.S)
+PAGE_RE = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+TEXT_OP_RE = re.compile(rb"\((?:\\.|[^\\)])*\)\s*Tj|\[(?:\\.|[^\]])*\]\s*TJ", re.S)
+STRING_RE = re.compile(rb"\(((?:\\.|[^\\)])*)\)", re.S)
+META_RE = re.compile(rb"/(" + b"|".join(k.encode() for k in META_KEYS) + rb")\s*\(((?:\\.|[^\\)])*)\)")
+ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+
+
+def _unescape(raw):
+    def repl(m):
+        s = m.group(1)
+        if s[:1].isdigit():
+            return bytes([int(s, 8) & 0xFF])
+        return ESCAPES.get(s, s)
+    return re.sub(rb"\\([0-7]{1,3}|.)", repl, raw, flags=re.S)
+
+
+def _decode(raw):
+    raw = _unescape(raw)
+    if raw.startswith(b"\xfe\xff"):
+        return raw[2:].decode("utf-16-be", "ignore")
+    return raw.decode("cp1251" if re.search(rb"[\xc0-\xff]", raw) else "latin-1", "ignore")
+
+
+def extract_simple(data):
+    parts = [data]
+    for header, body in STREAM_RE.findall(data):
+        if b"/FlateDecode" in header:
+            try:
+                parts.append(zlib.decompress(body))
+            except zlib.error:
+                pass
+
+    page_count = sum(len(PAGE_RE.findall(p)) for p in parts)
+    lines = []
+    for part in parts[1:]:
+        for op in TEXT_OP_RE.findall(part):
+            lines.append("".join(_decode(s) for s in STRING_RE.findall(op)))
+    meta = {k.decode(): _decode(v) for k, v in META_RE.findall(data)}
+    return "\n".join(lines), page_count or None, meta
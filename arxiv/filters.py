@@ -0,0 +1,106 @@
+import datetime
+
+from .search import search_arxiv, search_ordering, search_pdf_text
+
+# список разрешённых полей для поиска (чтобы не было “инъекций” через GET)
+SEARCH_FIELDS = {"all", "reg_num", "customer", "object_name", "book_number", "pdf_text"}
+
+# фильтры-справочники (?region=<id>...). Для каждого есть составные индексы
+# (поле, ключ сортировки) в Arxiv.Meta.indexes — строки читаются уже в нужном порядке
+INDEXED_FILTERS = ("region", "district", "prog", "object_type")
+
+# sort -> порядок для keyset-пагинации (заканчивается уникальным полем)
+SORTS = {
+    "-id": ["-id"],
+    "-reg_date": ["-reg_date", "-id"],
+    "reg_date": ["reg_date", "id"],
+    "customer": ["customer", "id"],
+    "-customer": ["-customer", "-id"],
+    "reg_num": ["reg_num"],
+    "-reg_num": ["-reg_num"],
+}
+# с диапазоном дат без filesort можно только сортировать по дате — она и берётся,
+# если пользователь не выбрал сортировку сам
+DATE_SORTS = ("-reg_date", "reg_date")
+# id вне BIGINT драйвер БД не примет (OverflowError) — такой фильтр просто не применяется
+MAX_ID = 2**63 - 1
+
+
+def _int(value):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if -MAX_ID <= value <= MAX_ID else None
+
+
+def parse_id(value):
+    """id из GET-параметра: целое 1..MAX_ID, иначе None."""
+    value = _int(value)
+    return value if value is not None and value > 0 else None
+
+
+def _date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def filter_arxiv(qs, params):
+    """
+    Фильтры списка архива из GET-параметров: q, field; region, district, prog,
+    object_type (id), is_mutch (0/1), date_from, date_to (ГГГГ-ММ-ДД); sort.
+    Общие для arxiv_list, экспорта и остальных выборок "как в списке".
+    Возвращает (qs, filters) — filters пригодны для шаблона и ключей кэша.
+    """
+    q = params.get("q", "").strip()
+    field = params.get("field", "all")  # all | reg_num | customer | object_name | book_number | pdf_text
+    if field not in SEARCH_FIELDS:
+        field = "all"
+
+    if q and field == "pdf_text":
+        # по словам из текста PDF (заполняется фоновой задачей)
+        qs = search_pdf_text(qs, q)
+    elif q:
+        # поиск через индекс arxiv_search_token (см. arxiv/search.py)
+        qs = search_arxiv(qs, q, field)
+
+    filters = {"q": q, "field": field}
+    for name in INDEXED_FILTERS:
+        value = _int(params.get(name))
+        if value is not None:
+            qs = qs.filter(**{f"{name}_id": value})
+        filters[name] = value
+
+    is_mutch = params.get("is_mutch")
+    if is_mutch in ("0", "1"):
+        qs = qs.filter(is_mutch=is_mutch == "1")
+    else:
+        is_mutch = ""
+    filters["is_mutch"] = is_mutch
+
+    date_from, date_to = _date(params.get("date_from")), _date(params.get("date_to"))
+    if date_from:
+        qs = qs.filter(reg_date__gte=date_from)
+    if date_to:
+        qs = qs.filter(reg_date__lte=date_to)
+    filters["date_from"] = date_from.isoformat() if date_from else ""
+    filters["date_to"] = date_to.isoformat() if date_to else ""
+
+    sort = params.get("sort", "")
+    if sort not in SORTS:
+        sort = ""
+    if (date_from or date_to) and not sort and not q:
+        # своей сортировки нет — по дате: диапазон дат и порядок из одного индекса
+        sort = "-reg_date"
+    filters["sort"] = sort
+
+    return qs, filters
+
+
+def list_ordering(qs, filters):
+    # явная сортировка; без неё — по релевантности поиска или новые сверху
+    if filters["sort"]:
+        return SORTS[filters["sort"]]
+    return search_ordering(qs)
@@ -1,4 +1,5 @@
 from django import forms
+from .lookups import CachedModelChoiceField
 from .models import Arxiv, PdfStorage
 
 
@@ -16,6 +17,13 @@ class ArxivForm(forms.ModelForm):
             "is_mutch", "book_number",
         ]
         widgets = {"reg_date": forms.DateInput(attrs={"type": "date"})}
+        # справочники — из кэша в памяти процесса, без запросов на каждый рендер
+        field_classes = {
+            "prog": CachedModelChoiceField,
+            "region": CachedModelChoiceField,
+            "district": CachedModelChoiceField,
+            "object_type": CachedModelChoiceField,
+        }
 
     def clean_pdf_file(self):
         f = self.cleaned_data.get("pdf_file")
@@ -35,4 +43,53 @@ class ArxivForm(forms.ModelForm):
         if region and district:
             if district.region_id != region.id:
                 self.add_error("district", "Выбранный район не принадлежит выбранной области.")
-        return cleaned
\ No newline at end of file
+        return cleaned
+
+# поля, которые можно менять сразу у многих записей (массовое изменение)
+BULK_FIELDS = [
+    "book_number", "is_mutch", "work_type",
+    "signed_person", "branch_manager", "specialist",
+    "prog", "object_type",
+]
+
+
+class ArxivBulkForm(ArxivForm):
+    """
+    Массовое изменение: те же поля и проверки, что в ArxivForm,
+    но меняются только поля, отмеченные в apply.
+    """
+    pdf_file = None
+    apply = forms.MultipleChoiceField(label="Изменить поля", widget=forms.CheckboxSelectMultiple)
+
+    class Meta(ArxivForm.Meta):
+        fields = ["apply", *BULK_FIELDS]
+
+    def __init__(self, *args, queryset, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.queryset = queryset
+        self.fields["apply"].choices = [(name, self.fields[name].label) for name in BULK_FIELDS]
+        # обязательность проверяем только у отмеченных полей
+        self.required_fields = {name for name in BULK_FIELDS if self.fields[name].required}
+        for name in BULK_FIELDS:
+            self.fields[name].required = False
+
+    def clean(self):
+        from .bulk import BULK_EDIT_MAX
+
+        cleaned = super().clean()
+        for name in cleaned.get("apply", []):
+            field = self.fields[name]
+            if name in self.required_fields and not self.has_error(name) and cleaned.get(name) in field.empty_values:
+                self.add_error(name, field.error_messages["required"])
+
+        count = self.queryset.count()
+        if not count:
+            raise forms.ValidationError("Не выбрано ни одной записи.")
+        if count > BULK_EDIT_MAX:
+            raise forms.ValidationError(
+                f"Выбрано {count} записей, за один раз можно изменить не больше {BULK_EDIT_MAX}. Уточните фильтр."
+            )
+        return cleaned
+
+    def changes(self):
+        return {name: self.cleaned_data[name] for name in self.cleaned_data["apply"]}
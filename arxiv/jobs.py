@@ -0,0 +1,99 @@
+"""
+Простая очередь фоновых задач в таблице background_job.
+
+enqueue("pdf_text", pdf.id) — поставить задачу (после коммита транзакции);
+manage.py run_jobs — воркер, который забирает задачи пачками и выполняет
+их в пуле потоков или процессов. Успешные задачи удаляются, упавшие
+повторяются с паузой, после JOB_MAX_ATTEMPTS остаются со статусом failed.
+"""
+import datetime
+import os
+import socket
+import traceback
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+# kind -> обработчик handler(object_id)
+JOB_HANDLERS = {
+    "pdf_text": "arxiv.extract.extract_pdf_text",
+    "pdf_gc": "arxiv.refs.collect_pdf",
+}
+
+MAX_ATTEMPTS = getattr(settings, "ARXIV_JOB_MAX_ATTEMPTS", 5)
+RETRY_DELAY = datetime.timedelta(seconds=30)
+
+
+def enqueue(kind, object_id, delay=None):
+    def create():
+        pending = Job.objects.filter(kind=kind, object_id=object_id, status=Job.STATUS_PENDING)
+        if delay:
+            # отложенная задача: уже стоящую в очереди просто сдвигаем
+            run_after = timezone.now() + delay
+            if not pending.update(run_after=run_after):
+                Job.objects.create(kind=kind, object_id=object_id, run_after=run_after)
+        elif not pending.exists():
+            Job.objects.create(kind=kind, object_id=object_id)
+
+    transaction.on_commit(create)
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim(worker, limit, kinds=None):
+    """Забирает до limit задач; два воркера одну задачу не получат (SKIP LOCKED)."""
+    now = timezone.now()
+    with transaction.atomic():
+        qs = Job.objects.select_for_update(skip_locked=True).filter(
+            status=Job.STATUS_PENDING, run_after__lte=now,
+        )
+        if kinds:
+            qs = qs.filter(kind__in=kinds)
+        ids = list(qs.order_by("id").values_list("id", flat=True)[:limit])
+        Job.objects.filter(id__in=ids, status=Job.STATUS_PENDING).update(
+            status=Job.STATUS_RUNNING, locked_by=worker, locked_at=now,
+        )
+    return list(Job.objects.filter(id__in=ids, locked_by=worker, status=Job.STATUS_RUNNING))
+
+
+def requeue_stale(timeout):
+    # воркер умер посреди задачи — возвращаем её в очередь
+    return Job.objects.filter(
+        status=Job.STATUS_RUNNING, locked_at__lt=timezone.now() - timeout,
+    ).update(status=Job.STATUS_PENDING, locked_by="", locked_at=None)
+
+
+def run_job(kind, object_id):
+    # выполняется в потоке/процессе пула
+    close_old_connections()
+    try:
+        import_string(JOB_HANDLERS[kind])(object_id)
+    finally:
+        close_old_connections()
+
+
+def finish(job, error=None):
+    if error is None:
+        job.delete()
+        return
+
+    job.attempts += 1
+    job.error = error
+    job.locked_by = ""
+    job.locked_at = None
+    if job.attempts >= MAX_ATTEMPTS:
+        job.status = Job.STATUS_FAILED
+    else:
+        job.status = Job.STATUS_PENDING
+        job.run_after = timezone.now() + RETRY_DELAY * job.attempts
+    job.save()
+
+
+def format_error(exc):
+    return "".join(traceback.format_exception(exc))[-4000:]
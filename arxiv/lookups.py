@@ -0,0 +1,97 @@
+"""
+Кэш справочников (Prog, Region, District, ObjectType) в памяти процесса.
+
+Справочники почти не меняются, поэтому строки держим в процессе, а проверяем
+только номер версии в общем кэше Django. После коммита post_save/post_delete
+версия меняется (см. arxiv/signals.py), и каждый процесс перечитывает таблицу
+при следующем обращении. Если CACHES не общий (LocMemCache на несколько воркеров),
+локальная копия всё равно живёт не дольше ARXIV_LOOKUP_TTL секунд.
+"""
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.forms.models import ModelChoiceField, ModelChoiceIterator
+
+from .models import District, ObjectType, Prog, Region
+
+LOOKUP_MODELS = (Prog, Region, District, ObjectType)
+
+LOCAL_TTL = getattr(settings, "ARXIV_LOOKUP_TTL", 60)
+
+# label -> (version, loaded_at, objects, by_pk)
+_local = {}
+
+
+def _version_key(model):
+    return f"arxiv:lookup:{model._meta.label_lower}"
+
+
+def lookup_version(model):
+    return cache.get_or_set(_version_key(model), lambda: uuid.uuid4().hex, None)
+
+
+def bump_version(model):
+    # после коммита, как и поколение страниц: при откате версия не меняется, а
+    # параллельный запрос не закэширует старые строки под уже новой версией
+    def bump():
+        cache.set(_version_key(model), uuid.uuid4().hex, None)
+        _local.pop(model._meta.label_lower, None)
+
+    transaction.on_commit(bump)
+
+
+def _load(model):
+    label = model._meta.label_lower
+    version = lookup_version(model)
+    entry = _local.get(label)
+    if entry is None or entry[0] != version or time.monotonic() - entry[1] > LOCAL_TTL:
+        objects = list(model._default_manager.all())
+        entry = (version, time.monotonic(), objects, {obj.pk: obj for obj in objects})
+        _local[label] = entry
+    return entry
+
+
+def cached_objects(model):
+    # порядок — как в Meta.ordering модели
+    return _load(model)[2]
+
+
+def cached_get(model, pk):
+    return _load(model)[3].get(pk)
+
+
+def districts_for_region(region_id):
+    return [d for d in cached_objects(District) if d.region_id == region_id]
+
+
+class CachedModelChoiceIterator(ModelChoiceIterator):
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for obj in cached_objects(self.queryset.model):
+            yield self.choice(obj)
+
+    def __len__(self):
+        return len(cached_objects(self.queryset.model)) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(cached_objects(self.queryset.model))
+
+
+class CachedModelChoiceField(ModelChoiceField):
+    """ModelChoiceField, который берёт варианты и проверку значения из кэша справочника."""
+
+    iterator = CachedModelChoiceIterator
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            obj = cached_get(self.queryset.model, int(value))
+        except (TypeError, ValueError):
+            obj = None
+        # нет в кэше (например, только что добавили) — обычная проверка через БД
+        return obj if obj is not None else super().to_python(value)
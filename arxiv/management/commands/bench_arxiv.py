@@ -0,0 +1,247 @@
+import json
+import re
+import statistics
+import time
+import tracemalloc
+import uuid
+from urllib.parse import unquote
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from arxiv import pagecache
+from arxiv.views import PAGE_SIZES
+from arxiv.models import Arxiv, District, ObjectType, PdfStorage, Prog, Region
+
+
+def percentile(values, p):
+    values = sorted(values)
+    k = (len(values) - 1) * p / 100
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+NEXT_RE = re.compile(r'cursor=([^"&]+)">Keyingi')
+
+
+def consume(response):
+    # потоковый ответ нужно дочитать — иначе PDF так и не будет прочитан
+    if response.streaming:
+        size = sum(len(chunk) for chunk in response.streaming_content)
+        response.close()
+        return size
+    return len(response.content)
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочный прогон основных страниц архива внутри процесса (django.test.Client): "
+        "перцентили времени, SQL-запросы, пик памяти; сравнение с сохранённым baseline. "
+        "Данные — manage.py seed_arxiv."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=30)
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument("--only", nargs="*", help="Запустить только эти сценарии")
+        parser.add_argument("--username", help="Пользователь для входа (по умолчанию первый суперпользователь)")
+        parser.add_argument("--host", default="localhost", help="HTTP_HOST запросов (должен быть в ALLOWED_HOSTS)")
+        parser.add_argument("--page-cache", action="store_true", help="Не отключать кэш страниц списка")
+        parser.add_argument("--no-row-cache", action="store_true", help="Отключить кэш строк таблицы списка")
+        parser.add_argument("--save-baseline", metavar="PATH")
+        parser.add_argument("--baseline", metavar="PATH", help="Сравнить с baseline")
+        parser.add_argument("--threshold", type=float, default=20.0, help="Допустимое замедление p50, %%")
+        parser.add_argument("--fail-on-regression", action="store_true")
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.client = Client(HTTP_HOST=options["host"])
+        self.client.force_login(self.get_user(options["username"]))
+        if not options["page_cache"]:
+            # меряем саму выборку и рендер, а не попадание в кэш
+            pagecache.PAGE_TTL = 0
+        if options["no_row_cache"]:
+            # сравнение с кэшем строк: прогон с флагом и без, --baseline
+            pagecache.ROW_TTL = 0
+
+        self.created = []
+        scenarios = self.scenarios()
+        if options["only"]:
+            unknown = set(options["only"]) - set(scenarios)
+            if unknown:
+                raise CommandError(f"Нет сценариев: {', '.join(sorted(unknown))}. Есть: {', '.join(scenarios)}")
+            scenarios = {name: scenarios[name] for name in options["only"]}
+
+        results = {}
+        try:
+            for name, make_request in scenarios.items():
+                if make_request is None:
+                    self.stdout.write(f"{name:<18} пропущен (нет данных)")
+                    continue
+                results[name] = self.run(make_request)
+                self.print_result(name, results[name])
+        finally:
+            Arxiv.objects.filter(pk__in=self.created).delete()
+
+        if options["save_baseline"]:
+            with open(options["save_baseline"], "w") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Baseline сохранён: {options['save_baseline']}")
+        if options["baseline"]:
+            self.compare(results, options["baseline"])
+
+    def get_user(self, username):
+        users = get_user_model().objects
+        user = users.filter(username=username).first() if username else users.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError("Нужен пользователь: --username или хотя бы один суперпользователь.")
+        return user
+
+    # --- сценарии ---
+
+    def scenarios(self):
+        get = self.client.get
+        list_url = reverse("arxiv_list")
+        pdf = PdfStorage.objects.metadata().order_by("-file_size").first()
+        region = Region.objects.filter(districts__isnull=False).first()
+        sample = Arxiv.objects.order_by("-id").first()
+
+        return {
+            "list_plain": lambda: get(list_url),
+            "list_search": lambda: get(list_url, {"q": "qurilish", "field": "all"}),
+            "list_search_reg": lambda: get(list_url, {"q": "0001", "field": "reg_num"}),
+            "list_deep": lambda: get(list_url, {"cursor": "last"}),
+            "list_wide": lambda: get(list_url, {"per_page": max(PAGE_SIZES)}),
+            "list_filtered": region and (lambda: get(list_url, {"region": region.id, "sort": "customer"})),
+            "list_next_pages": self.next_pages,
+            "pdf_view": pdf and (lambda: get(reverse("pdf_view", args=[pdf.id]))),
+            "pdf_download": pdf and (lambda: get(reverse("pdf_download", args=[pdf.id]))),
+            "pdf_range": pdf and (lambda: get(reverse("pdf_view", args=[pdf.id]), HTTP_RANGE="bytes=0-65535")),
+            "districts": region and (lambda: get(reverse("districts_by_region"), {"region_id": region.id})),
+            "create": region and self.create,
+            "edit": sample and (lambda: self.edit(sample.pk)),
+        }
+
+    def next_pages(self, depth=20):
+        # 20 страниц подряд по курсору — время на всю цепочку
+        response = self.client.get(reverse("arxiv_list"))
+        for _ in range(depth - 1):
+            found = NEXT_RE.search(response.content.decode())
+            if not found:
+                break
+            response = self.client.get(reverse("arxiv_list"), {"cursor": unquote(found.group(1))})
+        return response
+
+    def form_data(self, arxiv=None):
+        if arxiv is None:
+            district = District.objects.filter(region__isnull=False).first()
+            return {
+                "reg_num": f"BENCH-{uuid.uuid4().hex[:12]}",
+                "reg_date": "2024-01-15",
+                "customer": "Bench",
+                "prog": Prog.objects.values_list("id", flat=True).first(),
+                "region": district.region_id,
+                "district": district.id,
+                "object_type": ObjectType.objects.values_list("id", flat=True).first(),
+                "object_name": "Bench obyekt",
+                "work_type": "Sinov",
+                "signed_person": "Bench",
+                "branch_manager": "Bench",
+                "specialist": "Bench",
+                "book_number": "1",
+            }
+        return {
+            "reg_num": arxiv.reg_num, "reg_date": arxiv.reg_date.isoformat(), "customer": arxiv.customer,
+            "prog": arxiv.prog_id, "region": arxiv.region_id, "district": arxiv.district_id,
+            "object_type": arxiv.object_type_id, "object_name": arxiv.object_name, "work_type": arxiv.work_type,
+            "signed_person": arxiv.signed_person, "branch_manager": arxiv.branch_manager,
+            "specialist": arxiv.specialist, "book_number": arxiv.book_number,
+            **({"is_mutch": "on"} if arxiv.is_mutch else {}),
+        }
+
+    def create(self):
+        data = self.form_data()
+        response = self.client.post(reverse("arxiv_create"), data)
+        self.created += Arxiv.objects.filter(reg_num=data["reg_num"]).values_list("pk", flat=True)
+        return response
+
+    def edit(self, pk):
+        # сохраняем запись без изменений — полный путь формы и сигналов
+        return self.client.post(reverse("arxiv_edit", args=[pk]), self.form_data(Arxiv.objects.get(pk=pk)))
+
+    # --- замеры ---
+
+    def run(self, make_request):
+        for _ in range(self.options["warmup"]):
+            consume(make_request())
+
+        timings, queries, sizes, statuses = [], [], [], set()
+        for _ in range(self.options["repeat"]):
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                response = make_request()
+                size = consume(response)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries.append(len(ctx.captured_queries))
+            sizes.append(size)
+            statuses.add(response.status_code)
+
+        # память — отдельным запросом: tracemalloc замедляет каждое выделение и исказил бы время
+        tracemalloc.start()
+        try:
+            consume(make_request())
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "p50": percentile(timings, 50),
+            "p90": percentile(timings, 90),
+            "p99": percentile(timings, 99),
+            "max": max(timings),
+            "mean": statistics.fmean(timings),
+            "queries": statistics.fmean(queries),
+            "bytes": statistics.fmean(sizes),
+            "peak_kb": peak / 1024,
+            "status": sorted(statuses),
+        }
+
+    def print_result(self, name, r):
+        self.stdout.write(
+            f"{name:<18} p50 {r['p50']:8.2f}  p90 {r['p90']:8.2f}  p99 {r['p99']:8.2f}  max {r['max']:8.2f} ms"
+            f"  SQL {r['queries']:5.1f}  ответ {r['bytes'] / 1024:9.1f} KB  пик {r['peak_kb']:9.1f} KB"
+            f"  HTTP {','.join(map(str, r['status']))}"
+        )
+
+    def compare(self, results, path):
+        try:
+            with open(path) as f:
+                baseline = json.load(f)
+        except OSError as e:
+            raise CommandError(f"Не удалось прочитать baseline: {e}")
+
+        threshold = self.options["threshold"]
+        regressions = []
+        self.stdout.write(f"\nСравнение с {path} (p50, SQL, пик памяти):")
+        for name, r in results.items():
+            base = baseline.get(name)
+            if not base:
+                continue
+            change = (r["p50"] - base["p50"]) / base["p50"] * 100 if base["p50"] else 0.0
+            line = (
+                f"{name:<18} p50 {base['p50']:8.2f} → {r['p50']:8.2f} ms ({change:+6.1f}%)"
+                f"  SQL {base['queries']:.1f} → {r['queries']:.1f}"
+                f"  пик {base['peak_kb']:.0f} → {r['peak_kb']:.0f} KB"
+            )
+            if change > threshold or r["queries"] > base["queries"]:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+
+        if regressions and self.options["fail_on_regression"]:
+            raise CommandError(f"Регрессия: {', '.join(regressions)}")
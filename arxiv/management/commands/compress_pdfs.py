@@ -0,0 +1,84 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models.functions import Length
+
+from arxiv.compression import CODECS, COMPRESSORS, compress_best
+from arxiv.models import PdfStorage
+from arxiv.storage import DatabaseBlobStorage
+
+
+class Command(BaseCommand):
+    help = (
+        "Сжимает BLOB в pdf_storage.content пачками (только если это экономит место). "
+        "Можно прерывать и запускать снова; --sleep снижает нагрузку на рабочую БД."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--codec", action="append", choices=sorted(COMPRESSORS),
+                            help="Кодек-кандидат (можно несколько; по умолчанию ARXIV_PDF_CODECS)")
+        parser.add_argument("--recompress", action="store_true", help="Пересжать и уже сжатые")
+        parser.add_argument("--decompress", action="store_true", help="Наоборот: вернуть все BLOB без сжатия")
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--limit", type=int, default=0, help="Максимум PDF за запуск (0 — все)")
+        parser.add_argument("--sleep", type=float, default=0, help="Пауза между пачками, секунд")
+
+    def handle(self, *args, codec, recompress, decompress, batch_size, limit, sleep, **options):
+        if decompress and (codec or recompress):
+            raise CommandError("--decompress нельзя сочетать с --codec/--recompress")
+        codecs = [] if decompress else (codec or CODECS)
+        if not decompress and not codecs:
+            raise CommandError("Кодеки не заданы: укажите --codec или ARXIV_PDF_CODECS")
+
+        qs = (
+            PdfStorage.objects.metadata()
+            .filter(storage=PdfStorage.STORAGE_DB, file_size__gt=0)
+            .annotate(stored_size=Length("content"))
+        )
+        if decompress:
+            qs = qs.exclude(codec="")
+        elif not recompress:
+            qs = qs.filter(codec="")
+
+        done = changed = saved = 0
+        last_id = 0
+        while not (limit and done >= limit):
+            batch = list(qs.filter(id__gt=last_id).order_by("id")[:batch_size])
+            if not batch:
+                break
+            for pdf in batch:
+                last_id = pdf.id
+                before, after = self.process(pdf, codecs)
+                done += 1
+                if after is not None:
+                    changed += 1
+                    saved += before - after
+                if limit and done >= limit:
+                    break
+            self.stdout.write(f"... обработано {done}, изменено {changed}, сэкономлено {saved} байт (id <= {last_id})")
+            if sleep:
+                time.sleep(sleep)
+
+        self.stdout.write(self.style.SUCCESS(f"Готово: изменено {changed} из {done}, сэкономлено {saved} байт."))
+
+    def process(self, pdf, codecs):
+        # по одному BLOB в памяти
+        data = b"".join(DatabaseBlobStorage().iter_chunks(pdf, 0, pdf.file_size - 1))
+        if len(data) != pdf.file_size:
+            self.stderr.write(f"id={pdf.id}: размер {len(data)} не совпадает с file_size, пропуск")
+            return 0, None
+
+        stored = pdf.stored_size
+        new_codec, packed = compress_best(data, codecs)
+        # при сжатии/пересжатии новый вариант должен быть меньше хранимого: иначе
+        # --recompress вернул бы сжатую строку без выигрыша 5% в исходный (больший) вид
+        if new_codec == pdf.codec or (codecs and len(packed) >= stored):
+            return stored, None
+
+        # codec в условии: строку мог параллельно обработать другой запуск
+        updated = (
+            PdfStorage.objects
+            .filter(pk=pdf.pk, codec=pdf.codec, storage=PdfStorage.STORAGE_DB)
+            .update(codec=new_codec, content=packed)
+        )
+        return stored, len(packed) if updated else None
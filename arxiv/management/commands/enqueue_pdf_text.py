@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from arxiv.models import Job, PdfStorage
+
+
+class Command(BaseCommand):
+    help = "Ставит в очередь извлечение текста для PDF, у которых его ещё нет."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Для всех PDF, а не только без текста")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, all, batch_size, **options):
+        qs = PdfStorage.objects.all()
+        if not all:
+            qs = qs.filter(text__isnull=True)
+        queued = set(
+            Job.objects.filter(kind="pdf_text", status=Job.STATUS_PENDING).values_list("object_id", flat=True)
+        )
+
+        total = 0
+        batch = []
+        for pdf_id in qs.values_list("id", flat=True).order_by("id").iterator(chunk_size=batch_size):
+            if pdf_id in queued:
+                continue
+            batch.append(Job(kind="pdf_text", object_id=pdf_id))
+            if len(batch) >= batch_size:
+                Job.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        Job.objects.bulk_create(batch)
+        total += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"В очередь поставлено {total} задач."))
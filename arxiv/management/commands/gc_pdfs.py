@@ -0,0 +1,52 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+
+from arxiv.refs import GRACE, collect_batch, orphans_summary, recount_refs
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаляет PDF, на которые не ссылается ни одна запись Arxiv, небольшими транзакциями "
+        "(блокируются только строки pdf_storage). Показывает, сколько места освобождено."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--limit", type=int, default=0, help="Максимум PDF за запуск (0 — все)")
+        parser.add_argument("--grace", type=int, default=int(GRACE.total_seconds()),
+                            help="Не трогать PDF, ставшие сиротами меньше стольких секунд назад")
+        parser.add_argument("--sleep", type=float, default=0, help="Пауза между пачками, секунд")
+        parser.add_argument("--recount", action="store_true", help="Сначала пересчитать ref_count по arxiv")
+        parser.add_argument("--dry-run", action="store_true", help="Только показать, что будет удалено")
+
+    def handle(self, *args, batch_size, limit, grace, sleep, recount, dry_run, **options):
+        grace = datetime.timedelta(seconds=grace)
+        if recount:
+            self.stdout.write(f"Исправлено счётчиков ссылок: {recount_refs()}")
+
+        if dry_run:
+            count, size = orphans_summary(grace)
+            self.stdout.write(f"Сирот: {count}, занимают {size} байт.")
+            return
+
+        deleted = reclaimed = skipped = 0
+        while not (limit and deleted >= limit):
+            size = min(batch_size, limit - deleted) if limit else batch_size
+            n, freed, busy = collect_batch(size, grace)
+            skipped += busy
+            # целая пачка снова привязанных — тоже выход, чтобы не крутиться на одних и тех же
+            if not n:
+                break
+            deleted += n
+            reclaimed += freed
+            self.stdout.write(f"... удалено {deleted}, освобождено {reclaimed} байт")
+            if sleep:
+                time.sleep(sleep)
+
+        self.stdout.write(self.style.SUCCESS(f"Готово: удалено {deleted} PDF, освобождено {reclaimed} байт."))
+        if skipped:
+            self.stdout.write(f"Пропущено (PDF снова привязан к записи): {skipped}")
+        if deleted:
+            self.stdout.write("Чтобы MySQL вернул место на диске: OPTIMIZE TABLE pdf_storage;")
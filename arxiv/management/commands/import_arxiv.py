@@ -0,0 +1,288 @@
+import csv
+import datetime
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from arxiv.models import Arxiv, District, ObjectType, PdfStorage, Prog, Region
+from arxiv.bulk import after_bulk_create
+from arxiv.storage import get_backend
+
+TEXT_FIELDS = [
+    "reg_num", "customer", "object_name", "work_type",
+    "signed_person", "branch_manager", "specialist", "book_number",
+]
+TRUE_VALUES = {"1", "true", "yes", "ha", "да", "+", "muvofiq"}
+DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y")
+
+
+def hash_file(path):
+    # выполняется в отдельном процессе; ошибка чтения — результат, а не исключение,
+    # иначе pool.map оборвал бы весь импорт на одном файле
+    hasher = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(chunk)
+            size = f.tell()
+    except OSError as e:
+        return path, None, None, e.strerror or str(e)
+    return path, hasher.hexdigest(), size, None
+
+
+def read_csv(path, delimiter):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f, delimiter=delimiter):
+            yield row
+
+
+def read_xlsx(path):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise CommandError("Для XLSX нужен openpyxl: pip install openpyxl")
+    # read_only — строки читаются потоком, файл целиком в память не грузится
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = [str(h or "").strip() for h in next(rows, [])]
+        for values in rows:
+            yield dict(zip(header, values))
+    finally:
+        wb.close()
+
+
+def parse_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    value = str(value or "").strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, fmt).date()
+        except ValueError:
+            pass
+    raise ValidationError(f"Неверная дата: {value!r}")
+
+
+def clean_str(value):
+    return "" if value is None else str(value).strip()
+
+
+class Command(BaseCommand):
+    help = (
+        "Массовый импорт записей архива из CSV/XLSX. Колонки называются как поля Arxiv "
+        "(reg_num, reg_date, customer, prog, region, district, object_type, ...), "
+        "справочники — по названию, колонка pdf — путь к файлу относительно --pdf-dir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--pdf-dir", default="")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--delimiter", default=",")
+        parser.add_argument("--create-lookups", action="store_true",
+                            help="Создавать отсутствующие программы/области/районы/типы объектов")
+        parser.add_argument("--errors", help="CSV-файл для строк с ошибками")
+
+    def handle(self, *args, path, pdf_dir, batch_size, workers, delimiter, create_lookups, errors, **options):
+        if path.lower().endswith(".xlsx"):
+            rows = read_xlsx(path)
+        else:
+            rows = read_csv(path, delimiter)
+
+        self.pdf_dir = pdf_dir
+        self.create_lookups = create_lookups
+        self.load_lookups()
+        self.errors = []
+        created = 0
+        line = 1  # строка 1 — заголовок
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            self.pool = pool
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                numbered = list(enumerate(batch, start=line + 1))
+                line += len(batch)
+                created += self.import_batch(numbered)
+                self.stdout.write(f"... строк {line - 1}, добавлено {created}, ошибок {len(self.errors)}")
+
+        self.errors.sort()
+        if errors and self.errors:
+            with open(errors, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["line", "error"])
+                writer.writerows(self.errors)
+        for num, message in self.errors[:50]:
+            self.stderr.write(f"строка {num}: {message}")
+
+        self.stdout.write(self.style.SUCCESS(f"Готово: добавлено {created}, ошибок {len(self.errors)}."))
+
+    # --- справочники ---
+
+    def load_lookups(self):
+        # справочники маленькие — грузим целиком, дальше только словари
+        self.progs = {p.prog_name.casefold(): p for p in Prog.objects.all()}
+        self.regions = {r.name.casefold(): r for r in Region.objects.all()}
+        self.districts = {d.name.casefold(): d for d in District.objects.all()}
+        self.object_types = {o.name.casefold(): o for o in ObjectType.objects.all()}
+
+    def resolve(self, cache, model, name_field, value, **extra):
+        name = clean_str(value)
+        if not name:
+            raise ValidationError(f"Пустое значение для {model._meta.model_name}")
+        obj = cache.get(name.casefold())
+        if obj is None:
+            if not self.create_lookups:
+                raise ValidationError(f"{model._meta.model_name} {name!r} не найден")
+            obj, _ = model.objects.get_or_create(**{name_field: name}, defaults=extra)
+            cache[name.casefold()] = obj
+        return obj
+
+    # --- строки ---
+
+    def build(self, row):
+        region = self.resolve(self.regions, Region, "name", row.get("region"))
+        district = self.resolve(self.districts, District, "name", row.get("district"), region=region)
+        if district.region_id and district.region_id != region.id:
+            raise ValidationError("Выбранный район не принадлежит выбранной области.")
+
+        arxiv = Arxiv(
+            reg_date=parse_date(row.get("reg_date")),
+            prog=self.resolve(self.progs, Prog, "prog_name", row.get("prog")),
+            region=region,
+            district=district,
+            object_type=self.resolve(self.object_types, ObjectType, "name", row.get("object_type")),
+            is_mutch=clean_str(row.get("is_mutch")).casefold() in TRUE_VALUES,
+            **{f: clean_str(row.get(f)) for f in TEXT_FIELDS},
+        )
+        arxiv.full_clean(exclude=["pdf"], validate_unique=False)
+        return arxiv
+
+    def import_batch(self, numbered):
+        items = []
+        seen = set()
+        for num, row in numbered:
+            try:
+                arxiv = self.build(row)
+            except ValidationError as e:
+                self.errors.append((num, "; ".join(e.messages)))
+                continue
+            if arxiv.reg_num in seen:
+                self.errors.append((num, f"reg_num {arxiv.reg_num} повторяется в файле"))
+                continue
+            seen.add(arxiv.reg_num)
+            items.append((num, row, arxiv))
+
+        # уникальность reg_num — одним запросом на пачку
+        existing = set(
+            Arxiv.objects.filter(reg_num__in=[a.reg_num for _, _, a in items]).values_list("reg_num", flat=True)
+        )
+        ok = []
+        for num, row, arxiv in items:
+            if arxiv.reg_num in existing:
+                self.errors.append((num, f"reg_num {arxiv.reg_num} уже есть в базе"))
+            else:
+                ok.append((num, row, arxiv))
+
+        self.attach_pdfs(ok)
+        ok = [(num, arxiv) for num, _, arxiv in ok if not getattr(arxiv, "_pdf_error", None)]
+        return self.insert(ok)
+
+    # --- PDF ---
+
+    def attach_pdfs(self, items):
+        paths = {}
+        for num, row, arxiv in items:
+            rel = clean_str(row.get("pdf"))
+            if rel:
+                paths.setdefault(os.path.join(self.pdf_dir, rel), []).append((num, arxiv))
+        if not paths:
+            return
+
+        missing = [p for p in paths if not os.path.isfile(p)]
+        for p in missing:
+            self.pdf_failed(paths.pop(p), f"PDF не найден: {p}")
+
+        # хэши считаем параллельно в пуле процессов
+        hashed = []
+        for path, sha256, size, error in self.pool.map(hash_file, list(paths), chunksize=8):
+            if error:
+                self.pdf_failed(paths.pop(path), f"PDF не читается: {path}: {error}")
+            else:
+                hashed.append((path, sha256, size))
+        known = {
+            p.sha256: p
+            for p in PdfStorage.objects.metadata().filter(sha256__in=[h for _, h, _ in hashed])
+        }
+        backend = get_backend()
+        for path, sha256, size in hashed:
+            pdf = known.get(sha256)
+            if pdf is None:
+                # одинаковые файлы в папке сохраняются один раз
+                pdf = PdfStorage(
+                    file_name=os.path.basename(path),
+                    mime_type="application/pdf",
+                    file_size=size,
+                    sha256=sha256,
+                )
+                try:
+                    with open(path, "rb") as f:
+                        backend.save(pdf, File(f))
+                except OSError as e:
+                    # файл пропал или не читается уже после хэширования
+                    self.pdf_failed(paths[path], f"PDF не читается: {path}: {e.strerror or e}")
+                    continue
+                try:
+                    with transaction.atomic():
+                        pdf.save()
+                    pdf.content = b""
+                except IntegrityError:
+                    # тот же файл параллельно сохранили загрузка формы или другой импорт
+                    pdf = PdfStorage.objects.metadata().get(sha256=sha256)
+                known[sha256] = pdf
+            for _, arxiv in paths[path]:
+                arxiv.pdf = pdf
+
+    def pdf_failed(self, rows, message):
+        # строки с этим PDF не вставляются, остальные импортируются как обычно
+        for num, arxiv in rows:
+            arxiv._pdf_error = True
+            self.errors.append((num, message))
+
+    # --- запись ---
+
+    def insert(self, items):
+        if not items:
+            return 0
+        try:
+            with transaction.atomic():
+                Arxiv.objects.bulk_create([a for _, a in items])
+        except IntegrityError:
+            # кто-то успел вставить те же reg_num — по одной, чтобы найти виноватую строку
+            created = 0
+            for num, arxiv in items:
+                try:
+                    with transaction.atomic():
+                        arxiv.save()
+                    created += 1
+                except IntegrityError as e:
+                    self.errors.append((num, str(e)))
+            return created
+
+        self.after_bulk_insert([a.reg_num for _, a in items])
+        return len(items)
+
+    def after_bulk_insert(self, reg_nums):
+        # поисковый индекс, статистика, ссылки на PDF (arxiv/bulk.py)
+        after_bulk_create(reg_nums)
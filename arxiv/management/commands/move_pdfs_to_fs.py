@@ -0,0 +1,97 @@
+import hashlib
+
+from django.core.management.base import BaseCommand
+
+from arxiv.models import PdfStorage
+from arxiv.storage import DatabaseBlobStorage, FileSystemBlobStorage
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит PDF из pdf_storage.content (LONGBLOB) в файловое хранилище "
+        "ARXIV_PDF_ROOT. Можно прерывать и запускать снова — продолжит с места остановки."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--limit", type=int, default=0, help="Максимум файлов за запуск (0 — все)")
+
+    def handle(self, *args, batch_size, limit, **options):
+        fs = FileSystemBlobStorage()
+        moved = moved_bytes = skipped = 0
+        last_id = 0
+
+        while True:
+            batch = list(
+                PdfStorage.objects.metadata()
+                .filter(storage=PdfStorage.STORAGE_DB, id__gt=last_id)
+                .order_by("id")[:batch_size]
+            )
+            if not batch:
+                break
+
+            for pdf in batch:
+                last_id = pdf.id
+                if limit and moved >= limit:
+                    break
+                if self.move_one(fs, pdf):
+                    moved += 1
+                    moved_bytes += pdf.file_size
+                else:
+                    skipped += 1
+
+            self.stdout.write(f"... перенесено {moved}, пропущено {skipped} (id <= {last_id})")
+            if limit and moved >= limit:
+                break
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Готово: перенесено {moved} файлов ({moved_bytes} байт), пропущено {skipped}."
+        ))
+        if moved:
+            self.stdout.write("Чтобы MySQL вернул место на диске: OPTIMIZE TABLE pdf_storage;")
+
+    def move_one(self, fs, pdf):
+        # Файл уже на диске (прошлый запуск упал до UPDATE) — только переключаем строку
+        if not (pdf.sha256 and fs.exists(pdf.sha256)):
+            if not self.copy_blob(fs, pdf):
+                return False
+
+        # BLOB в таблице больше не нужен
+        updated = (
+            PdfStorage.objects
+            .filter(pk=pdf.pk, storage=PdfStorage.STORAGE_DB)
+            .update(storage=PdfStorage.STORAGE_FS, content=b"", codec="", sha256=pdf.sha256)
+        )
+        return bool(updated)
+
+    def copy_blob(self, fs, pdf):
+        if not pdf.sha256:
+            # У старых записей хэша может не быть — считаем по содержимому
+            sha256 = self.hash_blob(pdf)
+            if PdfStorage.objects.filter(sha256=sha256).exclude(pk=pdf.pk).exists():
+                self.stderr.write(f"id={pdf.id}: дубликат другого PDF (sha256={sha256}), пропуск")
+                return False
+            pdf.sha256 = sha256
+            if fs.exists(sha256):
+                return True
+
+        # Копируем BLOB на диск кусками, по дороге сверяем sha256
+        hasher = hashlib.sha256()
+
+        def chunks():
+            for chunk in DatabaseBlobStorage().iter_chunks(pdf, 0, pdf.file_size - 1):
+                hasher.update(chunk)
+                yield chunk
+
+        path = fs.write(pdf.sha256, chunks())
+        if hasher.hexdigest() != pdf.sha256:
+            self.stderr.write(f"id={pdf.id}: sha256 не совпадает с содержимым, пропуск")
+            path.unlink()
+            return False
+        return True
+
+    def hash_blob(self, pdf):
+        hasher = hashlib.sha256()
+        for chunk in DatabaseBlobStorage().iter_chunks(pdf, 0, pdf.file_size - 1):
+            hasher.update(chunk)
+        return hasher.hexdigest()
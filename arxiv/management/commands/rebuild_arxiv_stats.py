@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+from arxiv.models import Arxiv, ArxivStat
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает сводную таблицу arxiv_stat одним GROUP BY по arxiv."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, batch_size, **options):
+        rows = (
+            Arxiv.objects.order_by()
+            .annotate(month=TruncMonth("reg_date"))
+            .values("region_id", "district_id", "prog_id", "object_type_id", "is_mutch", "month")
+            .annotate(n=Count("id"))
+        )
+        with transaction.atomic():
+            ArxivStat.objects.all().delete()
+            created = ArxivStat.objects.bulk_create(
+                (ArxivStat(count=row.pop("n"), **row) for row in rows.iterator()),
+                batch_size=batch_size,
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Статистика пересчитана: {len(created)} строк."))
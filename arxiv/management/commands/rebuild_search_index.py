@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from arxiv.models import Arxiv, SearchToken
+from arxiv.search import index_new
+
+
+class Command(BaseCommand):
+    help = "Полностью перестраивает поисковый индекс arxiv_search_token."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, batch_size, **options):
+        SearchToken.objects.all().delete()
+
+        fields = ["id", "reg_num", "book_number", "customer", "object_name"]
+        last_id = 0
+        done = 0
+        while True:
+            batch = list(Arxiv.objects.filter(id__gt=last_id).order_by("id").only(*fields)[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                index_new(batch)
+            last_id = batch[-1].id
+            done += len(batch)
+            self.stdout.write(f"... {done}")
+
+        self.stdout.write(self.style.SUCCESS(f"Индекс перестроен: {done} записей."))
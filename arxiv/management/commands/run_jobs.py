@@ -0,0 +1,62 @@
+import datetime
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from arxiv.jobs import claim, finish, format_error, requeue_stale, run_job, worker_name
+
+
+def init_process():
+    # при spawn (не fork) дочерний процесс стартует без настроенного Django
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = "Воркер фоновых задач (извлечение текста из PDF и др.)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=0,
+                            help="Размер пула процессов (для тяжёлого разбора PDF)")
+        parser.add_argument("--threads", type=int, default=4,
+                            help="Размер пула потоков, если --processes не задан")
+        parser.add_argument("--kind", action="append", dest="kinds", help="Только задачи этого типа")
+        parser.add_argument("--poll", type=float, default=2.0, help="Пауза, когда очередь пуста (сек)")
+        parser.add_argument("--stale-after", type=int, default=600,
+                            help="Через сколько секунд задача 'running' считается брошенной")
+        parser.add_argument("--once", action="store_true", help="Выйти, когда очередь опустеет")
+
+    def handle(self, *args, processes, threads, kinds, poll, stale_after, once, **options):
+        worker = worker_name()
+        stale = datetime.timedelta(seconds=stale_after)
+
+        if processes:
+            # перед fork закрываем соединения — дочерние процессы откроют свои
+            connections.close_all()
+            pool = ProcessPoolExecutor(max_workers=processes, initializer=init_process)
+            size = processes
+        else:
+            pool = ThreadPoolExecutor(max_workers=threads)
+            size = threads
+
+        self.stdout.write(f"Воркер {worker}: пул {size} ({'процессы' if processes else 'потоки'})")
+        with pool:
+            while True:
+                requeue_stale(stale)
+                jobs = claim(worker, size * 2, kinds)
+                if not jobs:
+                    if once:
+                        break
+                    time.sleep(poll)
+                    continue
+
+                futures = {pool.submit(run_job, job.kind, job.object_id): job for job in jobs}
+                for future in as_completed(futures):
+                    job = futures[future]
+                    exc = future.exception()
+                    finish(job, format_error(exc) if exc else None)
+                    if exc:
+                        self.stderr.write(f"{job}: {exc}")
+                self.stdout.write(f"... выполнено {len(jobs)}")
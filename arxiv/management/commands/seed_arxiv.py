@@ -0,0 +1,151 @@
+import datetime
+import hashlib
+import random
+import zlib
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from arxiv.bulk import after_bulk_create
+from arxiv.models import Arxiv, District, ObjectType, PdfStorage, Prog, Region
+from arxiv.storage import get_backend
+
+REGIONS = {
+    "Toshkent shahri": ["Chilonzor", "Yunusobod", "Mirzo Ulug'bek", "Yakkasaroy", "Sergeli"],
+    "Toshkent viloyati": ["Zangiota", "Qibray", "Chirchiq", "Bo'stonliq"],
+    "Samarqand": ["Samarqand sh.", "Urgut", "Kattaqo'rg'on", "Pastdarg'om"],
+    "Buxoro": ["Buxoro sh.", "G'ijduvon", "Kogon", "Romitan"],
+    "Farg'ona": ["Farg'ona sh.", "Marg'ilon", "Qo'qon", "Rishton"],
+    "Andijon": ["Andijon sh.", "Asaka", "Xonobod", "Shahrixon"],
+    "Namangan": ["Namangan sh.", "Chust", "Pop", "Uychi"],
+    "Qashqadaryo": ["Qarshi", "Shahrisabz", "Kitob", "G'uzor"],
+    "Surxondaryo": ["Termiz", "Denov", "Sherobod", "Boysun"],
+    "Xorazm": ["Urganch", "Xiva", "Hazorasp", "Shovot"],
+    "Navoiy": ["Navoiy sh.", "Zarafshon", "Karmana"],
+    "Jizzax": ["Jizzax sh.", "G'allaorol", "Zomin"],
+    "Sirdaryo": ["Guliston", "Yangiyer", "Sirdaryo t."],
+    "Qoraqalpog'iston": ["Nukus", "Beruniy", "To'rtko'l", "Qo'ng'irot"],
+}
+PROGS = ["Obod qishloq", "Obod mahalla", "Yangi O'zbekiston", "Davlat dasturi", "Investitsiya dasturi"]
+OBJECT_TYPES = ["Maktab", "Bog'cha", "Poliklinika", "Turar-joy binosi", "Yo'l", "Suv quvuri", "Sport majmuasi"]
+WORDS = [
+    "qurilish", "ta'mirlash", "rekonstruksiya", "binosi", "markaz", "ko'chasi", "mahalla",
+    "maktab", "kasalxona", "yo'l", "suv", "issiqlik", "tarmog'i", "loyiha", "obyekt", "ob'ekt",
+]
+COMPANIES = ["Qurilish Invest", "Buyurtmachi Xizmati", "Hokimiyat", "Yagona buyurtmachi", "Obod Qurilish"]
+NAMES = ["Aliyev A.", "Karimov B.", "Rahimova D.", "Toshmatov E.", "Yusupova G.", "Nazarov H.", "Saidov I."]
+
+
+def make_pdf(text, size):
+    """Минимальный корректный PDF с одной строкой текста, дополненный до ~size байт."""
+    content = zlib.compress(f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1", "replace"))
+    padding = random.randbytes(max(0, size - 700))  # несжимаемый поток — размер как у скана
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> /XObject << /Im1 6 0 R >> >> >>",
+        b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(content), content),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Type /XObject /Subtype /Image /Width 1 /Height 1 /ColorSpace /DeviceGray "
+        b"/BitsPerComponent 8 /Length %d >>\nstream\n%s\nendstream" % (len(padding), padding),
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (num, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет базу синтетическими записями архива для нагрузочных тестов: "
+        "справочники, N записей Arxiv и PDF разных размеров."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--pdfs", type=int, default=200, help="Сколько разных PDF создать")
+        parser.add_argument("--pdf-share", type=float, default=0.7, help="Доля записей с PDF")
+        parser.add_argument("--min-size", type=int, default=20 * 1024)
+        parser.add_argument("--max-size", type=int, default=5 * 1024 * 1024)
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--prefix", default="SEED", help="Префикс reg_num — повторный запуск с тем же префиксом продолжит нумерацию")
+
+    def handle(self, *args, rows, pdfs, pdf_share, min_size, max_size, batch_size, seed, prefix, **options):
+        random.seed(seed)
+        regions, districts, progs, object_types = self.seed_lookups()
+        pdf_ids = self.seed_pdfs(pdfs, min_size, max_size)
+
+        start = Arxiv.objects.filter(reg_num__startswith=f"{prefix}-").count()
+        today = datetime.date.today()
+        created = 0
+        while created < rows:
+            batch = []
+            for i in range(start + created, start + min(created + batch_size, rows)):
+                region = random.choice(regions)
+                reg_date = today - datetime.timedelta(days=random.randint(0, 365 * 8))
+                batch.append(Arxiv(
+                    reg_num=f"{prefix}-{i:07d}",
+                    reg_date=reg_date,
+                    customer=random.choice(COMPANIES) + " " + random.choice(["MChJ", "DUK", "AJ"]),
+                    prog=random.choice(progs),
+                    region=region,
+                    district=random.choice(districts[region.id]),
+                    object_type=random.choice(object_types),
+                    object_name=" ".join(random.sample(WORDS, random.randint(2, 5))).capitalize(),
+                    work_type=random.choice(["Sinov", "Ekspertiza", "Laboratoriya tahlili"]),
+                    signed_person=random.choice(NAMES),
+                    branch_manager=random.choice(NAMES),
+                    specialist=random.choice(NAMES),
+                    is_mutch=random.random() < 0.8,
+                    book_number=f"{reg_date.year}/{random.randint(1, 40)}",
+                    pdf_id=random.choice(pdf_ids) if pdf_ids and random.random() < pdf_share else None,
+                ))
+            with transaction.atomic():
+                Arxiv.objects.bulk_create(batch)
+                after_bulk_create([a.reg_num for a in batch])
+            created += len(batch)
+            self.stdout.write(f"... {created}/{rows}")
+
+        self.stdout.write(self.style.SUCCESS(f"Готово: {created} записей, {len(pdf_ids)} PDF."))
+
+    def seed_lookups(self):
+        regions, districts = [], {}
+        for region_name, district_names in REGIONS.items():
+            region, _ = Region.objects.get_or_create(name=region_name)
+            regions.append(region)
+            found = [
+                District.objects.get_or_create(name=name, defaults={"region": region})[0]
+                for name in district_names
+            ]
+            # район с таким именем мог уже быть в другой области — такие пропускаем
+            districts[region.id] = [d for d in found if d.region_id == region.id] or [
+                District.objects.get_or_create(name=f"{region_name} tumani", defaults={"region": region})[0]
+            ]
+        progs = [Prog.objects.get_or_create(prog_name=name)[0] for name in PROGS]
+        object_types = [ObjectType.objects.get_or_create(name=name)[0] for name in OBJECT_TYPES]
+        return regions, districts, progs, object_types
+
+    def seed_pdfs(self, count, min_size, max_size):
+        backend = get_backend()
+        ids = []
+        for i in range(count):
+            # размеры логарифмически равномерны: много маленьких, немного больших
+            size = int(min_size * (max_size / min_size) ** random.random()) if max_size > min_size else min_size
+            data = make_pdf(f"Bayonnoma {i} {' '.join(random.sample(WORDS, 4))}", size)
+            sha256 = hashlib.sha256(data).hexdigest()
+            pdf = PdfStorage.objects.metadata().filter(sha256=sha256).first()
+            if pdf is None:
+                pdf = PdfStorage(file_name=f"bayonnoma_{i}.pdf", file_size=len(data), sha256=sha256)
+                backend.save(pdf, ContentFile(data))
+                pdf.save()
+            ids.append(pdf.id)
+        return ids
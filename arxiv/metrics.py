@@ -0,0 +1,260 @@
+"""
+Метрики запросов: число SQL-запросов, время SQL, байты PDF из хранилища,
+размер ответа и длительность — по каждому view.
+
+MetricsMiddleware пишет их в заголовок Server-Timing и копит в памяти процесса
+гистограммы, которые отдаёт metrics_view в текстовом формате Prometheus.
+SQL считается через execute_wrapper на каждом соединении (ставится сигналом
+connection_created), байты PDF — в arxiv/storage.py через add_blob_bytes().
+Счётчики свои у каждого процесса: при нескольких воркерах Prometheus должен
+опрашивать каждый из них (или суммировать по instance).
+"""
+import contextvars
+import hmac
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+SERVER_TIMING = getattr(settings, "ARXIV_METRICS_SERVER_TIMING", True)
+# Prometheus: bearer_token из ARXIV_METRICS_TOKEN; адреса — только если сервер
+# приложения видит настоящий адрес клиента (за локальным прокси это адрес прокси)
+TOKEN = getattr(settings, "ARXIV_METRICS_TOKEN", "")
+ALLOWED_IPS = getattr(settings, "ARXIV_METRICS_ALLOWED_IPS", [])
+
+# имя -> (описание, границы корзин)
+HISTOGRAMS = {
+    "arxiv_request_duration_seconds": (
+        "Длительность запроса", (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    ),
+    "arxiv_request_sql_queries": (
+        "SQL-запросов на запрос", (0, 1, 2, 5, 10, 20, 50, 100, 200),
+    ),
+    "arxiv_request_sql_seconds": (
+        "Время SQL на запрос", (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+    ),
+    "arxiv_response_bytes": (
+        "Размер ответа", (1024, 10240, 102400, 1048576, 10485760, 104857600),
+    ),
+}
+COUNTERS = {
+    "arxiv_requests_total": "Запросов (по статусу ответа)",
+    "arxiv_blob_read_bytes_total": "Байт PDF прочитано из хранилища",
+}
+
+_current = contextvars.ContextVar("arxiv_request_metrics", default=None)
+_lock = threading.Lock()
+# (name, labels) -> [counts по корзинам..., +Inf, sum]
+_histograms = {}
+# (name, labels) -> value
+_counters = defaultdict(float)
+
+
+class RequestMetrics:
+    __slots__ = ("start", "queries", "sql_time", "blob_bytes", "response_bytes")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.blob_bytes = 0
+        self.response_bytes = 0
+
+
+# --- сбор ---
+
+def sql_wrapper(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.sql_time += time.perf_counter() - start
+
+
+def install_sql_wrapper(sender, connection, **kwargs):
+    # connection_created приходит при каждом переподключении — ставим один раз
+    if sql_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(sql_wrapper)
+
+
+def add_blob_bytes(n):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.blob_bytes += n
+
+
+def observe(name, labels, value):
+    buckets = HISTOGRAMS[name][1]
+    with _lock:
+        row = _histograms.get((name, labels))
+        if row is None:
+            row = _histograms[(name, labels)] = [0] * (len(buckets) + 2)
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                row[i] += 1
+        row[-2] += 1
+        row[-1] += value
+
+
+def inc(name, labels, value=1):
+    with _lock:
+        _counters[(name, labels)] += value
+
+
+def record(view, status, metrics):
+    labels = (("view", view),)
+    observe("arxiv_request_duration_seconds", labels, time.perf_counter() - metrics.start)
+    observe("arxiv_request_sql_queries", labels, metrics.queries)
+    observe("arxiv_request_sql_seconds", labels, metrics.sql_time)
+    observe("arxiv_response_bytes", labels, metrics.response_bytes)
+    inc("arxiv_requests_total", labels + (("status", str(status)),))
+    if metrics.blob_bytes:
+        inc("arxiv_blob_read_bytes_total", labels, metrics.blob_bytes)
+
+
+# --- middleware ---
+
+def view_name(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match is not None else "<unresolved>"
+
+
+def server_timing(metrics):
+    total = (time.perf_counter() - metrics.start) * 1000
+    parts = [f'sql;dur={metrics.sql_time * 1000:.1f};desc="{metrics.queries} queries"']
+    if metrics.blob_bytes:
+        parts.append(f'blob;desc="{metrics.blob_bytes} bytes"')
+    parts.append(f"app;dur={total:.1f}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            _current.reset(token)
+            raise
+        return self.finish(request, response, metrics, token)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            _current.reset(token)
+            raise
+        return self.finish(request, response, metrics, token)
+
+    def finish(self, request, response, metrics, token):
+        view = view_name(request)
+        if SERVER_TIMING:
+            response["Server-Timing"] = server_timing(metrics)
+
+        if not response.streaming:
+            _current.reset(token)
+            metrics.response_bytes = len(response.content)
+            record(view, response.status_code, metrics)
+            return response
+
+        # потоковый ответ: PDF читается уже после выхода из view — итог пишем при close()
+        if getattr(response, "file_to_stream", None) is None:
+            response.streaming_content = self.count_stream(response, metrics)
+        close = response.close
+
+        def close_and_record():
+            try:
+                close()
+            finally:
+                if not metrics.response_bytes:
+                    metrics.response_bytes = int(response.get("Content-Length") or 0)
+                _current.set(None)
+                record(view, response.status_code, metrics)
+
+        response.close = close_and_record
+        return response
+
+    def count_stream(self, response, metrics):
+        if response.is_async:
+            return self._acount(response.streaming_content, metrics)
+        return self._count(response.streaming_content, metrics)
+
+    @staticmethod
+    def _count(content, metrics):
+        _current.set(metrics)
+        for chunk in content:
+            metrics.response_bytes += len(chunk)
+            yield chunk
+
+    @staticmethod
+    async def _acount(content, metrics):
+        _current.set(metrics)
+        async for chunk in content:
+            metrics.response_bytes += len(chunk)
+            yield chunk
+
+
+# --- /metrics ---
+
+def _labels(labels, extra=()):
+    items = tuple(labels) + tuple(extra)
+    if not items:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in items)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(items, escaped)) + "}"
+
+
+def render_metrics():
+    with _lock:
+        histograms = {key: list(row) for key, row in _histograms.items()}
+        counters = dict(_counters)
+
+    lines = []
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for (hname, labels), row in sorted(histograms.items()):
+            if hname != name:
+                continue
+            for bound, count in zip(buckets, row):
+                lines.append(f"{name}_bucket{_labels(labels, [('le', str(bound))])} {count}")
+            lines.append(f"{name}_bucket{_labels(labels, [('le', '+Inf')])} {row[-2]}")
+            lines.append(f"{name}_count{_labels(labels)} {row[-2]}")
+            lines.append(f"{name}_sum{_labels(labels)} {row[-1]}")
+    for name, help_text in COUNTERS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for (cname, labels), value in sorted(counters.items()):
+            if cname == name:
+                lines.append(f"{name}{_labels(labels)} {value:.0f}")
+    return "\n".join(lines) + "\n"
+
+
+def has_token(request):
+    auth = request.META.get("HTTP_AUTHORIZATION", "")
+    return bool(TOKEN) and hmac.compare_digest(auth.encode(), f"Bearer {TOKEN}".encode())
+
+
+def metrics_view(request):
+    # Prometheus ходит без логина — по токену; иначе только staff (или адреса из настроек)
+    if not (request.user.is_staff or has_token(request) or request.META.get("REMOTE_ADDR") in ALLOWED_IPS):
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 11:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('arxiv', '0002_alter_worktype_options_alter_arxiv_book_number_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pdfstorage',
+            name='page_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
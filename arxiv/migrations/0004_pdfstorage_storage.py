@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-18 11:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('arxiv', '0003_pdfstorage_page_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pdfstorage',
+            name='storage',
+            field=models.CharField(choices=[('db', 'База данных'), ('fs', 'Файловая система')], default='db', max_length=2),
+        ),
+        migrations.AlterField(
+            model_name='pdfstorage',
+            name='content',
+            field=models.BinaryField(default=b''),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-18 11:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('arxiv', '0004_pdfstorage_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('field', models.PositiveSmallIntegerField()),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('arxiv', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='arxiv.arxiv')),
+            ],
+            options={
+                'db_table': 'arxiv_search_token',
+                'indexes': [models.Index(fields=['token', 'field', 'arxiv', 'weight'], name='arxiv_searc_token_e284d1_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 6.0 on 2026-10-18 11:37
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('arxiv', '0005_search_token'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PdfText',
+            fields=[
+                ('pdf', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='text', serialize=False, to='arxiv.pdfstorage')),
+                ('text', models.TextField(blank=True)),
+                ('page_count', models.PositiveIntegerField(blank=True, null=True)),
+                ('meta', models.JSONField(blank=True, default=dict)),
+                ('extracted_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'pdf_text',
+            },
+        ),
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=50)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Выполняется'), ('failed', 'Ошибка')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_by', models.CharField(blank=True, max_length=100)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'background_job',
+                'indexes': [models.Index(fields=['status', 'run_after'], name='background__status_e24070_idx'), models.Index(fields=['kind', 'object_id'], name='background__kind_49afc3_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PdfSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64)),
+                ('pdf', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='arxiv.pdfstorage')),
+            ],
+            options={
+                'db_table': 'pdf_search_token',
+                'indexes': [models.Index(fields=['token', 'pdf'], name='pdf_search__token_7b57a4_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 6.0 on 2026-10-18 11:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+
+def fill_stats(apps, schema_editor):
+    # счётчики для уже существующих записей (как manage.py rebuild_arxiv_stats)
+    Arxiv = apps.get_model("arxiv", "Arxiv")
+    ArxivStat = apps.get_model("arxiv", "ArxivStat")
+    rows = (
+        Arxiv.objects.order_by()
+        .annotate(month=TruncMonth("reg_date"))
+        .values("region_id", "district_id", "prog_id", "object_type_id", "is_mutch", "month")
+        .annotate(n=Count("id"))
+    )
+    ArxivStat.objects.bulk_create(
+        (ArxivStat(count=row.pop("n"), **row) for row in rows.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('arxiv', '0006_pdf_text_and_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArxivStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_mutch', models.BooleanField()),
+                ('month', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('district', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='arxiv.district')),
+                ('object_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='arxiv.objecttype')),
+                ('prog', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='arxiv.prog')),
+                ('region', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='arxiv.region')),
+            ],
+            options={
+                'db_table': 'arxiv_stat',
+                'indexes': [models.Index(fields=['month'], name='arxiv_stat_month_06c5cc_idx')],
+                'constraints': [models.UniqueConstraint(fields=('region', 'district', 'prog', 'object_type', 'is_mutch', 'month'), name='arxiv_stat_unique_key')],
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
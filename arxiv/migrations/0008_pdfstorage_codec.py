@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 11:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('arxiv', '0007_arxiv_stat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pdfstorage',
+            name='codec',
+            field=models.CharField(blank=True, choices=[('', 'Без сжатия'), ('zlib', 'zlib'), ('lzma', 'lzma')], default='', max_length=8),
+        ),
+    ]
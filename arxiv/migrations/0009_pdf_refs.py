@@ -0,0 +1,41 @@
+# Generated by Django 6.0 on 2026-10-18 11:50
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_refs(apps, schema_editor):
+    # ссылки на уже существующие PDF; у неиспользуемых остаётся orphaned_at = время миграции
+    Arxiv = apps.get_model("arxiv", "Arxiv")
+    PdfStorage = apps.get_model("arxiv", "PdfStorage")
+    refs = Arxiv.objects.exclude(pdf=None).order_by().values("pdf_id").annotate(n=Count("id"))
+    for row in refs.iterator():
+        PdfStorage.objects.filter(pk=row["pdf_id"]).update(ref_count=row["n"], orphaned_at=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('arxiv', '0008_pdfstorage_codec'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pdfstorage',
+            name='orphaned_at',
+            field=models.DateTimeField(blank=True, default=django.utils.timezone.now, null=True),
+        ),
+        migrations.AddField(
+            model_name='pdfstorage',
+            name='ref_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='pdfstorage',
+            index=models.Index(fields=['orphaned_at'], name='pdf_storage_orphane_079122_idx'),
+        ),
+        migrations.RunPython(count_refs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 6.0 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('arxiv', '0009_pdf_refs'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='arxiv',
+            index=models.Index(fields=['region', 'reg_date'], name='arxiv_region__2c1302_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='arxiv',
+            index=models.Index(fields=['region', 'customer'], name='arxiv_region__32326e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='arxiv',
+            index=models.Index(fields=['region', 'reg_num'], name='arxiv_region__4f1d92_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='arxiv',
+            index=models.Index(fields=['district', 'reg_date'], name='arxiv_distric_95d517_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='arxiv',
+            index=models.Index(fields=['district', 'customer'], name='arxiv_distric_1a8922_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='arxiv',
+            index=models.Index(fields=['district', 'reg_num'], name='arxiv_distric_0207c5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='arxiv',
+            index=models.Index(fields=['prog', 'reg_date'], name='arxiv_prog_id_e14ee0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='arxiv',
+            index=models.Index(fields=['prog', 'customer'], name='arxiv_prog_id_74a83b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='arxiv',
+            index=models.Index(fields=['prog', 'reg_num'], name='arxiv_prog_id_e1077d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='arxiv',
+            index=models.Index(fields=['object_type', 'reg_date'], name='arxiv_object__e4157d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='arxiv',
+            index=models.Index(fields=['object_type', 'customer'], name='arxiv_object__f61689_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='arxiv',
+            index=models.Index(fields=['object_type', 'reg_num'], name='arxiv_object__d9c9c6_idx'),
+        ),
+    ]
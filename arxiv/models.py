@@ -1,14 +1,36 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
+
+
+class PdfStorageQuerySet(models.QuerySet):
+    def metadata(self):
+        # Всё, кроме самого BLOB — для списков, форм и админки
+        return self.defer("content")
 
 
 # --- PDF storage (отдельная таблица, вариант B: LONGBLOB) ---
 class PdfStorage(models.Model):
+    STORAGE_DB = "db"
+    STORAGE_FS = "fs"
+    STORAGE_CHOICES = [
+        (STORAGE_DB, "База данных"),
+        (STORAGE_FS, "Файловая система"),
+    ]
+    CODEC_CHOICES = [
+        ("", "Без сжатия"),
+        ("zlib", "zlib"),
+        ("lzma", "lzma"),
+    ]
+
     file_name = models.CharField(max_length=255)
     mime_type = models.CharField(max_length=100, default="application/pdf")
     file_size = models.PositiveIntegerField()
+    page_count = models.PositiveIntegerField(null=True, blank=True)
     sha256 = models.CharField(max_length=64, unique=True, null=True, blank=True)
-    content = models.BinaryField()  # MySQL -> LONGBLOB
+    codec = models.CharField(max_length=8, choices=CODEC_CHOICES, default="", blank=True)  # сжатие content
+    content = models.BinaryField(default=b"")  # MySQL -> LONGBLOB, пусто если storage=fs
+    storage = models.CharField(max_length=2, choices=STORAGE_CHOICES, default=STORAGE_DB)
     uploaded_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         null=True, blank=True,
@@ -16,9 +38,16 @@ class PdfStorage(models.Model):
         related_name="pdf_files",
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    # сколько записей Arxiv ссылаются на PDF (см. arxiv/refs.py) и с какого момента — ни одна.
+    # Новый PDF сирота, пока его не привязали к записи.
+    ref_count = models.PositiveIntegerField(default=0)
+    orphaned_at = models.DateTimeField(null=True, blank=True, default=timezone.now)
+
+    objects = PdfStorageQuerySet.as_manager()
 
     class Meta:
         db_table = "pdf_storage"
+        indexes = [models.Index(fields=["orphaned_at"])]
 
     def __str__(self):
         return self.file_name
@@ -80,6 +109,14 @@ class WorkType(models.Model):
 
 
 
+class ArxivQuerySet(models.QuerySet):
+    def with_pdf_meta(self):
+        # PDF подгружается отдельным запросом и без content
+        return self.prefetch_related(
+            models.Prefetch("pdf", queryset=PdfStorage.objects.metadata())
+        )
+
+
 # --- Основная таблица архива ---
 class Arxiv(models.Model):
     reg_num = models.CharField("Ro`yxatga olingan raqami", max_length=100, unique=True)       # регистрационный номер
@@ -131,6 +168,8 @@ class Arxiv(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ArxivQuerySet.as_manager()
+
     class Meta:
         db_table = "arxiv"
         ordering = ["-reg_date", "-id"]
@@ -139,7 +178,121 @@ class Arxiv(models.Model):
             models.Index(fields=["reg_date"]),
             models.Index(fields=["customer"]),
             models.Index(fields=["region", "district"]),
+            # фильтр списка (=) + сортировка: строки идут в порядке индекса, без filesort.
+            # id в конце любого вторичного индекса InnoDB есть неявно (для keyset по id).
+            # Сочетания — filters.SORTS и filters.INDEXED_FILTERS, проверка — arxiv/tests.py
+            models.Index(fields=["region", "reg_date"]),
+            models.Index(fields=["region", "customer"]),
+            models.Index(fields=["region", "reg_num"]),
+            models.Index(fields=["district", "reg_date"]),
+            models.Index(fields=["district", "customer"]),
+            models.Index(fields=["district", "reg_num"]),
+            models.Index(fields=["prog", "reg_date"]),
+            models.Index(fields=["prog", "customer"]),
+            models.Index(fields=["prog", "reg_num"]),
+            models.Index(fields=["object_type", "reg_date"]),
+            models.Index(fields=["object_type", "customer"]),
+            models.Index(fields=["object_type", "reg_num"]),
         ]
 
     def __str__(self):
         return f"{self.reg_num} ({self.reg_date})"
+
+
+# --- Поисковый индекс (n-граммы по полям Arxiv, см. arxiv/search.py) ---
+class SearchToken(models.Model):
+    arxiv = models.ForeignKey(Arxiv, on_delete=models.CASCADE, related_name="search_tokens")
+    token = models.CharField(max_length=64)
+    field = models.PositiveSmallIntegerField()
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        db_table = "arxiv_search_token"
+        indexes = [
+            # покрывающий индекс: поиск по токену + ранжирование без чтения таблицы
+            models.Index(fields=["token", "field", "arxiv", "weight"]),
+        ]
+
+    def __str__(self):
+        return f"{self.token} → {self.arxiv_id}"
+
+
+# --- Текст из PDF (заполняет фоновый обработчик, см. arxiv/extract.py) ---
+class PdfText(models.Model):
+    pdf = models.OneToOneField(PdfStorage, on_delete=models.CASCADE, primary_key=True, related_name="text")
+    text = models.TextField(blank=True)
+    page_count = models.PositiveIntegerField(null=True, blank=True)
+    meta = models.JSONField(default=dict, blank=True)
+    extracted_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "pdf_text"
+
+    def __str__(self):
+        return f"PDF {self.pdf_id}"
+
+
+class PdfSearchToken(models.Model):
+    # уникальные слова из текста PDF — для поиска по содержимому
+    pdf = models.ForeignKey(PdfStorage, on_delete=models.CASCADE, related_name="search_tokens")
+    token = models.CharField(max_length=64)
+
+    class Meta:
+        db_table = "pdf_search_token"
+        indexes = [models.Index(fields=["token", "pdf"])]
+
+
+# --- Очередь фоновых задач (обрабатывает manage.py run_jobs) ---
+class Job(models.Model):
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "В очереди"),
+        (STATUS_RUNNING, "Выполняется"),
+        (STATUS_FAILED, "Ошибка"),
+    ]
+
+    kind = models.CharField(max_length=50)
+    object_id = models.PositiveBigIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "background_job"
+        indexes = [
+            models.Index(fields=["status", "run_after"]),
+            models.Index(fields=["kind", "object_id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id} ({self.status})"
+
+
+# --- Сводная статистика (обновляется при сохранении/удалении Arxiv, см. arxiv/stats.py) ---
+class ArxivStat(models.Model):
+    region = models.ForeignKey(Region, on_delete=models.CASCADE, related_name="+")
+    district = models.ForeignKey(District, on_delete=models.CASCADE, related_name="+")
+    prog = models.ForeignKey(Prog, on_delete=models.CASCADE, related_name="+")
+    object_type = models.ForeignKey(ObjectType, on_delete=models.CASCADE, related_name="+")
+    is_mutch = models.BooleanField()
+    month = models.DateField()  # первое число месяца reg_date
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "arxiv_stat"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["region", "district", "prog", "object_type", "is_mutch", "month"],
+                name="arxiv_stat_unique_key",
+            ),
+        ]
+        indexes = [models.Index(fields=["month"])]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m}: {self.count}"
@@ -0,0 +1,111 @@
+"""
+Кэш готовых страниц arxiv_list.
+
+Ключ — "поколение" архива + GET-параметры. Поколение меняется после коммита
+любого сохранения/удаления Arxiv, PdfStorage и справочников (arxiv/signals.py),
+поэтому старые страницы просто перестают читаться и истекают сами по TTL.
+Токен CSRF в страницу не кэшируется: на его месте метка, которая при отдаче
+заменяется на токен текущего пользователя.
+Страница, собранная с реплики, могла не увидеть последнюю запись (реплика
+отстаёт, а поколение уже новое) — такие кэшируются не дольше
+ARXIV_LIST_CACHE_REPLICA_TTL.
+Поколение должно быть общим для всех воркеров, поэтому кэш страниц работает
+только с общим CACHES (Redis/Memcached/БД). С LocMemCache сброс поколения в
+одном процессе не видят остальные — там страницы не кэшируются.
+
+Отдельно кэшируются строки таблицы (render_rows): ключ — id и updated_at
+записи, данные PDF и версии справочников. После любой записи поколение
+меняется, но неизменённые строки новой страницы повторно не рендерятся.
+Версии справочников в ключе тоже живут в CACHES: без общего кэша строки
+хранятся не дольше ARXIV_LOOKUP_TTL — как и локальная копия справочников.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.template.loader import get_template, render_to_string
+from django.utils.safestring import mark_safe
+
+from .lookups import LOCAL_TTL as LOOKUP_LOCAL_TTL, LOOKUP_MODELS, lookup_version
+from .routing import read_db
+
+GENERATION_KEY = "arxiv:generation"
+PAGE_TTL = getattr(settings, "ARXIV_LIST_CACHE_TTL", 600)
+REPLICA_TTL = getattr(settings, "ARXIV_LIST_CACHE_REPLICA_TTL", 30)
+CSRF_PLACEHOLDER = "__arxiv_csrf_token__"
+ROW_TTL = getattr(settings, "ARXIV_LIST_ROW_CACHE_TTL", 24 * 3600)
+ROW_TEMPLATE = "arxiv/_arxiv_row.html"
+
+
+def shared_cache():
+    # LocMemCache у каждого процесса свой, DummyCache не хранит ничего
+    return not isinstance(caches["default"], (LocMemCache, DummyCache))
+
+
+def generation():
+    return cache.get_or_set(GENERATION_KEY, lambda: uuid.uuid4().hex, None)
+
+
+def bump_generation():
+    # после коммита: иначе параллельный запрос успеет закэшировать старые данные под новым поколением
+    transaction.on_commit(lambda: cache.set(GENERATION_KEY, uuid.uuid4().hex, None))
+
+
+def page_key(request):
+    params = sorted(request.GET.lists())
+    return f"arxiv:list:{generation()}:" + hashlib.md5(repr(params).encode()).hexdigest()
+
+
+def cached_page(request, template_name, build_context):
+    """
+    Отдаёт страницу из кэша или строит контекст (build_context()), рендерит и кэширует.
+    Если у пользователя есть flash-сообщения или кэш не общий, страница рендерится как обычно.
+    """
+    if PAGE_TTL <= 0 or not shared_cache() or len(get_messages(request)):
+        # строки из render_rows и здесь содержат метку вместо токена
+        html = render_to_string(template_name, build_context(), request)
+        return HttpResponse(html.replace(CSRF_PLACEHOLDER, get_token(request)))
+
+    key = page_key(request)
+    html = cache.get(key)
+    if html is None:
+        context = build_context()
+        context["csrf_token"] = CSRF_PLACEHOLDER
+        html = render_to_string(template_name, context)
+        ttl = PAGE_TTL if read_db() == DEFAULT_DB_ALIAS else min(PAGE_TTL, REPLICA_TTL)
+        cache.set(key, html, ttl)
+    return HttpResponse(html.replace(CSRF_PLACEHOLDER, get_token(request)))
+
+
+def row_key(arxiv, lookups):
+    # всё, что видно в строке: сама запись, её PDF и названия из справочников
+    pdf = f"{arxiv.pdf_id}:{arxiv.pdf.file_size}:{arxiv.pdf.file_name}" if arxiv.pdf_id else ""
+    raw = f"{arxiv.pk}:{arxiv.updated_at.isoformat()}:{pdf}:{lookups}"
+    return "arxiv:row:" + hashlib.md5(raw.encode()).hexdigest()
+
+
+def render_rows(items):
+    """HTML строк таблицы arxiv_list: готовые — из кэша одним get_many, остальные рендерятся."""
+    template = get_template(ROW_TEMPLATE)
+    context = {"csrf_token": CSRF_PLACEHOLDER}
+    if ROW_TTL <= 0:
+        return mark_safe("".join(template.render({**context, "x": x}) for x in items))
+
+    lookups = "-".join(str(lookup_version(model)) for model in LOOKUP_MODELS)
+    keys = [row_key(x, lookups) for x in items]
+    cached = cache.get_many(keys)
+    missing = {}
+    for key, x in zip(keys, items):
+        if key not in cached:
+            missing[key] = template.render({**context, "x": x})
+    if missing:
+        # переименование справочника в другом процессе LocMemCache не увидит
+        cache.set_many(missing, ROW_TTL if shared_cache() else min(ROW_TTL, LOOKUP_LOCAL_TTL))
+    return mark_safe("".join(cached.get(key) or missing[key] for key in keys))
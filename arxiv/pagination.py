@@ -0,0 +1,169 @@
+"""
+Keyset (cursor) пагинация для arxiv_list.
+
+Вместо OFFSET страница берётся условием "после последней строки предыдущей":
+WHERE id < :last_id ORDER BY id DESC LIMIT n — страница 5000 стоит столько же, сколько первая.
+Курсор — подписанная строка со значениями ключей сортировки (снаружи непрозрачна).
+"""
+import datetime
+import hashlib
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+
+CURSOR_SALT = "arxiv.cursor"
+LAST = "last"
+
+COUNT_TTL = getattr(settings, "ARXIV_LIST_COUNT_TTL", 300)
+
+
+class CursorPage:
+    def __init__(self, object_list, next_cursor=None, prev_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def _plain(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(obj, ordering, direction):
+    values = [_plain(getattr(obj, f.lstrip("-"))) for f in ordering]
+    return signing.dumps({"v": values, "d": direction, "o": ordering}, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(token):
+    # битый или чужой курсор — просто первая страница
+    if not token:
+        return None
+    if token == LAST:
+        return {"d": LAST}
+    try:
+        data = signing.loads(token, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        return None
+    if not isinstance(data, dict) or data.get("d") not in ("n", "p") or not isinstance(data.get("v"), list):
+        return None
+    return data
+
+
+def reverse_ordering(ordering):
+    return [f[1:] if f.startswith("-") else f"-{f}" for f in ordering]
+
+
+def keyset_q(ordering, values):
+    # (a, b) "после" (va, vb) с учётом направления каждого поля:
+    # a < va OR (a = va AND b < vb)
+    q = Q()
+    equal = {}
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        op = "lt" if field.startswith("-") else "gt"
+        q |= Q(**equal, **{f"{name}__{op}": value})
+        equal[name] = value
+    return q
+
+
+def paginate_keyset(qs, ordering, cursor, per_page):
+    """
+    ordering должен заканчиваться уникальным полем (id), иначе строки
+    с одинаковыми ключами могут потеряться между страницами.
+    """
+    data = decode_cursor(cursor)
+    if data and data["d"] != LAST and data.get("o") != list(ordering):
+        # курсор от другой сортировки — с начала
+        data = None
+    direction = data["d"] if data else "n"
+
+    if direction == "n":
+        page_qs = qs.order_by(*ordering)
+        if data:
+            page_qs = page_qs.filter(keyset_q(ordering, data["v"]))
+    else:
+        # назад (и последняя страница) — в обратном порядке, потом разворачиваем
+        back = reverse_ordering(ordering)
+        page_qs = qs.order_by(*back)
+        if direction == "p":
+            page_qs = page_qs.filter(keyset_q(back, data["v"]))
+
+    rows = list(page_qs[:per_page + 1])
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if direction == "n":
+        has_next, has_prev = more, data is not None
+    else:
+        rows.reverse()
+        has_next, has_prev = direction == "p", more
+
+    if not rows:
+        return CursorPage([])
+    return CursorPage(
+        rows,
+        next_cursor=encode_cursor(rows[-1], ordering, "n") if has_next else None,
+        prev_cursor=encode_cursor(rows[0], ordering, "p") if has_prev else None,
+    )
+
+
+def _estimated_rows(table):
+    # InnoDB хранит оценку числа строк — без COUNT(*) по всей таблице
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            [table],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def cached_count(qs, key_parts):
+    """
+    Общее число строк для виджета "≈ N записей".
+    Без фильтров на MySQL — оценка из information_schema,
+    иначе COUNT(*), закэшированный на ARXIV_LIST_COUNT_TTL секунд.
+    """
+    key = "arxiv:count:" + hashlib.md5(repr(key_parts).encode()).hexdigest()
+    total = cache.get(key)
+    if total is None:
+        if connection.vendor == "mysql" and not qs.query.has_filters():
+            total = _estimated_rows(qs.model._meta.db_table)
+        if total is None:
+            total = qs.count()
+        cache.set(key, total, COUNT_TTL)
+    return total
+
+
+def iter_by_id(qs, chunk_size, key=lambda obj: obj.pk):
+    """
+    Обходит весь qs пачками по chunk_size (WHERE id < :last ORDER BY id DESC).
+    В отличие от .iterator() на MySQL, в памяти только одна пачка.
+    """
+    qs = qs.order_by("-id")
+    last = None
+    while True:
+        chunk = list((qs if last is None else qs.filter(id__lt=last))[:chunk_size])
+        if not chunk:
+            return
+        yield from chunk
+        last = key(chunk[-1])
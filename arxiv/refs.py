@@ -0,0 +1,132 @@
+"""
+Ссылки Arxiv.pdf -> PdfStorage и сборка мусора для PDF, на которые никто не ссылается.
+
+PdfStorage.ref_count меняется сигналами Arxiv (arxiv/signals.py) и после
+bulk_create (arxiv/bulk.py). Когда счётчик падает до нуля, ставится
+orphaned_at и в очередь кладётся задача "pdf_gc" через ARXIV_PDF_GC_GRACE секунд:
+если PDF за это время снова привязали (повторная загрузка того же файла),
+удалять нечего. manage.py gc_pdfs делает то же для всех сирот пачками.
+
+Удаление идёт небольшими транзакциями: блокируются только строки pdf_storage
+(SELECT ... FOR UPDATE OF pdf_storage SKIP LOCKED), arxiv читается без блокировок —
+перед удалением ещё раз проверяем, что на PDF действительно никто не ссылается.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Case, Count, Exists, F, OuterRef, ProtectedError, Sum, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Arxiv, PdfStorage
+
+GRACE = datetime.timedelta(seconds=getattr(settings, "ARXIV_PDF_GC_GRACE", 3600))
+
+
+def change_refs(pdf_id, delta):
+    if not pdf_id or not delta:
+        return
+    now = timezone.now()
+    PdfStorage.objects.filter(pk=pdf_id).update(
+        ref_count=Greatest(F("ref_count") + delta, 0),
+        orphaned_at=Case(When(ref_count__lte=-delta, then=Value(now)), default=Value(None)),
+    )
+    if delta < 0:
+        from .jobs import enqueue
+
+        enqueue("pdf_gc", pdf_id, delay=GRACE)
+
+
+def add_refs(qs):
+    # после bulk_create: по одному UPDATE на каждый PDF
+    counts = qs.exclude(pdf=None).order_by().values("pdf_id").annotate(n=Count("id"))
+    for row in counts:
+        change_refs(row["pdf_id"], row["n"])
+
+
+def touch(pdf):
+    # PDF снова понадобился (загрузили тот же файл) — отсрочить удаление сироты
+    PdfStorage.objects.filter(pk=pdf.pk, orphaned_at__isnull=False).update(orphaned_at=timezone.now())
+
+
+def recount_refs():
+    """Пересчитывает ref_count по таблице arxiv (если счётчики разошлись). Возвращает число исправленных."""
+    fixed = 0
+    actual = dict(Arxiv.objects.exclude(pdf=None).order_by().values_list("pdf_id").annotate(n=Count("id")))
+    now = timezone.now()
+    for pk, ref_count in PdfStorage.objects.values_list("pk", "ref_count").iterator():
+        n = actual.get(pk, 0)
+        if n != ref_count:
+            PdfStorage.objects.filter(pk=pk).update(ref_count=n, orphaned_at=None if n else now)
+            fixed += 1
+    return fixed
+
+
+def _locked(qs):
+    # блокируем только строки pdf_storage; занятые другим сборщиком пропускаем
+    features = connection.features
+    if features.has_select_for_update_skip_locked and features.has_select_for_update_of:
+        return qs.select_for_update(skip_locked=True, of=("self",))
+    return qs
+
+
+def orphans(grace=GRACE):
+    unreferenced = ~Exists(Arxiv.objects.filter(pdf=OuterRef("pk")))
+    return (
+        PdfStorage.objects.metadata()
+        .filter(orphaned_at__lt=timezone.now() - grace)
+        .filter(unreferenced)
+    )
+
+
+def blob_sizes(qs):
+    # {id: размер PDF} по file_size: LENGTH(content) заставил бы сервер читать каждый LONGBLOB.
+    # Для сжатых это размер до сжатия — оценка сверху
+    return dict(qs.values_list("pk", "file_size"))
+
+
+def stored_bytes(qs):
+    return qs.aggregate(n=Sum("file_size"))["n"] or 0
+
+
+def orphans_summary(grace=GRACE):
+    # для --dry-run: (сколько сирот, сколько места занимают)
+    qs = orphans(grace)
+    return qs.count(), stored_bytes(qs)
+
+
+def _delete(pdf_id):
+    """
+    Удаляет один PDF. Через metadata(): сборщик удаления Django загружает строки
+    целиком (ради post_delete), а content нам не нужен. False — если PDF успели
+    снова привязать (PROTECT или внешний ключ в БД) — его пропускаем.
+    """
+    try:
+        with transaction.atomic():
+            PdfStorage.objects.metadata().filter(pk=pdf_id).delete()
+    except (ProtectedError, IntegrityError):
+        return False
+    return True
+
+
+def collect_batch(batch_size, grace=GRACE):
+    """Удаляет до batch_size сирот одной транзакцией. Возвращает (удалено, байт, пропущено)."""
+    deleted = reclaimed = skipped = 0
+    with transaction.atomic():
+        ids = list(_locked(orphans(grace).order_by("id")).values_list("id", flat=True)[:batch_size])
+        # post_delete удалит файлы с диска после коммита
+        for pk, size in blob_sizes(PdfStorage.objects.filter(pk__in=ids)).items():
+            if _delete(pk):
+                deleted += 1
+                reclaimed += size
+            else:
+                skipped += 1
+    return deleted, reclaimed, skipped
+
+
+def collect_pdf(pdf_id):
+    """Обработчик задачи "pdf_gc": удалить один PDF, если он всё ещё сирота."""
+    with transaction.atomic():
+        if _locked(orphans().filter(pk=pdf_id)).values_list("pk", flat=True).first() is not None:
+            _delete(pdf_id)
@@ -0,0 +1,141 @@
+"""
+Чтение с реплик БД.
+
+Запись всегда идёт в default (primary). На реплику (ARXIV_DB_REPLICAS, псевдонимы
+из DATABASES) уходят только запросы view, помеченных @replica_reads: список,
+поиск, выгрузки, статистика и отдача PDF — так тяжёлое чтение BLOB не конкурирует
+с сохранением форм.
+
+Чтение своих записей:
+- как только в запросе что-то пишется (db_for_write), все дальнейшие чтения
+  этого запроса идут в primary;
+- после запроса с записью ReplicaMiddleware ставит cookie, и следующие
+  ARXIV_DB_STICKY_SECONDS секунд этот пользователь читает только с primary —
+  после редиректа он видит свою запись, даже если реплика отстаёт.
+
+Вне HTTP-запроса (manage.py, run_jobs) роутер ничего не выбирает — всё идёт в default.
+PDF из БД дочитывается из той же базы, откуда загружены его метаданные
+(pdf._state.db), уже после выхода из view.
+"""
+import contextvars
+import random
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICAS = list(getattr(settings, "ARXIV_DB_REPLICAS", []))
+STICKY_SECONDS = getattr(settings, "ARXIV_DB_STICKY_SECONDS", 10)
+STICKY_COOKIE = "arxiv_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_current = contextvars.ContextVar("arxiv_db_state", default=None)
+
+
+class RequestDB:
+    __slots__ = ("pinned", "replica", "wrote")
+
+    def __init__(self, pinned):
+        self.pinned = pinned  # недавно писал — читаем только с primary
+        self.replica = None   # реплика для этого запроса (ставит @replica_reads)
+        self.wrote = False
+
+
+def read_db():
+    """Псевдоним БД, из которой сейчас читает запрос."""
+    state = _current.get()
+    if state is not None and state.replica and not state.wrote:
+        return state.replica
+    return DEFAULT_DB_ALIAS
+
+
+def _use_replica(request):
+    state = _current.get()
+    if state is None or state.pinned or not REPLICAS or request.method not in SAFE_METHODS:
+        return
+    state.replica = random.choice(REPLICAS)
+
+
+def replica_reads(view):
+    """View только читает — его запросы можно отдать реплике."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            _use_replica(request)
+            return await view(request, *args, **kwargs)
+    else:
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            _use_replica(request)
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    def __init__(self):
+        unknown = set(REPLICAS) - set(settings.DATABASES)
+        if unknown:
+            raise ImproperlyConfigured(f"ARXIV_DB_REPLICAS: нет в DATABASES: {', '.join(sorted(unknown))}")
+
+    def db_for_read(self, model, **hints):
+        state = _current.get()
+        if state is not None and state.replica and not state.wrote:
+            return state.replica
+        # None — Django возьмёт БД экземпляра (instance._state.db) или default
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # реплики — копии primary: объекты из разных копий можно связывать
+        dbs = {DEFAULT_DB_ALIAS, *REPLICAS}
+        if obj1._state.db in dbs and obj2._state.db in dbs:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # схему на реплики приносит репликация
+        if db in REPLICAS:
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RequestDB(pinned=STICKY_COOKIE in request.COOKIES)
+        token = _current.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(response, state)
+
+    async def __acall__(self, request):
+        state = RequestDB(pinned=STICKY_COOKIE in request.COOKIES)
+        token = _current.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(response, state)
+
+    def finish(self, response, state):
+        if state.wrote and REPLICAS and STICKY_SECONDS > 0:
+            response.set_cookie(STICKY_COOKIE, "1", max_age=STICKY_SECONDS, httponly=True, samesite="Lax")
+        return response
@@ -0,0 +1,175 @@
+"""
+Поиск по архиву через собственный инвертированный индекс (таблица arxiv_search_token).
+
+Каждое поисковое поле Arxiv режется на слова, слова — на триграммы.
+Запрос "тошкент 2024" находит записи, где есть все триграммы всех слов,
+и сортирует их по сумме весов совпавших полей. Работает одинаково на MySQL и SQLite:
+только обычный B-tree индекс по (token, field, arxiv, weight), без LIKE '%q%'.
+"""
+import re
+
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+
+from .models import PdfSearchToken, SearchToken
+
+NGRAM = 3
+
+# поле Arxiv -> (код в индексе, вес при ранжировании)
+FIELDS = {
+    "reg_num": (1, 4),
+    "book_number": (2, 3),
+    "customer": (3, 2),
+    "object_name": (4, 1),
+}
+
+# ʻ ’ ‘ ` ʼ — разные варианты апострофа в узбекской латинице (o‘, g‘)
+APOSTROPHES = str.maketrans({c: "'" for c in "ʻʼ’‘`´"})
+WORD_RE = re.compile(r"[\w']+")
+
+
+def normalize(text):
+    return (text or "").translate(APOSTROPHES).casefold().replace("ё", "е")
+
+
+def split_words(text):
+    return [w.strip("'") for w in WORD_RE.findall(normalize(text)) if w.strip("'")]
+
+
+def ngrams(word):
+    if len(word) <= NGRAM:
+        return {word}
+    return {word[i:i + NGRAM] for i in range(len(word) - NGRAM + 1)}
+
+
+def arxiv_tokens(arxiv):
+    # {(token, field_code): weight} для одной записи
+    tokens = {}
+    for name, (code, weight) in FIELDS.items():
+        for word in split_words(getattr(arxiv, name)):
+            for gram in ngrams(word):
+                tokens[(gram[:64], code)] = weight
+    return tokens
+
+
+def index_arxiv(arxiv):
+    """Обновляет токены записи: удаляет лишние, добавляет новые (разница, а не всё заново)."""
+    new = arxiv_tokens(arxiv)
+    old = {
+        (t, f): (pk, w)
+        for pk, t, f, w in SearchToken.objects.filter(arxiv=arxiv).values_list("id", "token", "field", "weight")
+    }
+
+    stale = [pk for key, (pk, w) in old.items() if new.get(key) != w]
+    if stale:
+        SearchToken.objects.filter(id__in=stale).delete()
+
+    SearchToken.objects.bulk_create([
+        SearchToken(arxiv=arxiv, token=t, field=f, weight=w)
+        for (t, f), w in new.items()
+        if old.get((t, f), (None, None))[1] != w
+    ])
+
+
+def index_new(arxivs, batch_size=5000):
+    """Индекс для только что вставленных записей (bulk_create не шлёт post_save)."""
+    SearchToken.objects.bulk_create(
+        [
+            SearchToken(arxiv_id=a.id, token=t, field=f, weight=w)
+            for a in arxivs
+            for (t, f), w in arxiv_tokens(a).items()
+        ],
+        batch_size=batch_size,
+    )
+
+
+def index_field(arxiv_ids, name, value, batch_size=5000):
+    """Поле name у всех arxiv_ids получило одно значение value (массовое изменение)."""
+    code, weight = FIELDS[name]
+    SearchToken.objects.filter(arxiv_id__in=arxiv_ids, field=code).delete()
+    grams = {gram[:64] for word in split_words(value) for gram in ngrams(word)}
+    SearchToken.objects.bulk_create(
+        [SearchToken(arxiv_id=pk, token=t, field=code, weight=weight) for pk in arxiv_ids for t in grams],
+        batch_size=batch_size,
+    )
+
+
+def _rejected(candidates, words, field_names):
+    # id кандидатов, где хотя бы одного слова нет подстрокой ни в одном поле —
+    # сравнение по тому же normalize(), по которому построен индекс (регистр, ё/е, апострофы)
+    rejected = []
+    for pk, *values in candidates.order_by().values_list("pk", *field_names).iterator(chunk_size=2000):
+        text = "\n".join(normalize(v) for v in values)
+        if not all(word in text for word in words):
+            rejected.append(pk)
+    return rejected
+
+
+def search_arxiv(qs, q, field="all"):
+    """
+    Фильтрует qs по строке поиска. Если использован индекс — добавляет
+    аннотацию search_rank (чем больше, тем выше в выдаче).
+
+    Триграммы только сужают выборку до кандидатов: "abcd" есть в "abcx ybcd"
+    по триграммам, но не как подстрока. Поэтому кандидаты потом проверяются
+    в Python по нормализованному тексту полей; ложные совпадения исключаются.
+    """
+    words = split_words(q)
+    if not words:
+        return qs
+
+    field_names = list(FIELDS) if field == "all" else [field]
+    tokens = set()
+    for word in words:
+        # 1–2 символа по триграммам не найти
+        if len(word) >= NGRAM:
+            tokens |= ngrams(word)
+
+    if not tokens:
+        # только короткие слова — без кандидатов из индекса, через icontains
+        for word in WORD_RE.findall(q.translate(APOSTROPHES)):
+            for part in filter(None, word.split("'")):
+                cond = Q()
+                for name in field_names:
+                    cond |= Q(**{f"{name}__icontains": part})
+                qs = qs.filter(cond)
+        return qs
+
+    hits = SearchToken.objects.filter(token__in=tokens)
+    if field != "all":
+        hits = hits.filter(field=FIELDS[field][0])
+
+    matched = (
+        hits.values("arxiv_id")
+        .annotate(n=Count("token", distinct=True))
+        .filter(n=len(tokens))
+        .values("arxiv_id")
+    )
+    rank = (
+        hits.filter(arxiv=OuterRef("pk"))
+        .values("arxiv_id")
+        .annotate(rank=Sum("weight"))
+        .values("rank")
+    )
+    qs = qs.filter(pk__in=matched)
+    rejected = _rejected(qs, words, field_names)
+    if rejected:
+        qs = qs.exclude(pk__in=rejected)
+    return qs.annotate(search_rank=Subquery(rank))
+
+
+def search_pdf_text(qs, q):
+    """
+    Поиск по тексту PDF (таблица pdf_search_token): каждое слово запроса —
+    префикс слова из документа, все слова должны встретиться.
+    """
+    for word in split_words(q):
+        pdf_ids = PdfSearchToken.objects.filter(token__startswith=word[:64]).values("pdf_id")
+        qs = qs.filter(pdf_id__in=pdf_ids)
+    return qs
+
+
+def search_ordering(qs):
+    # сначала самые релевантные, при равенстве — новые
+    if "search_rank" in qs.query.annotations:
+        return ["-search_rank", "-id"]
+    return ["-id"]
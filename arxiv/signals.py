@@ -0,0 +1,112 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Arxiv, PdfStorage
+
+
+@receiver(post_delete, sender=PdfStorage)
+def pdf_storage_deleted(sender, instance, **kwargs):
+    # Файл на диске удаляем только после коммита — при откате строка останется
+    from .storage import backend_for
+
+    transaction.on_commit(lambda: backend_for(instance).delete(instance))
+
+
+@receiver(post_save, sender=PdfStorage)
+def pdf_storage_saved(sender, instance, created, raw=False, **kwargs):
+    # текст и число страниц извлекаются в фоне (manage.py run_jobs)
+    if created and not raw:
+        from .jobs import enqueue
+
+        enqueue("pdf_text", instance.pk)
+
+
+@receiver(post_save, sender=Arxiv)
+def arxiv_saved(sender, instance, raw=False, **kwargs):
+    # поисковый индекс; токены удаляются вместе с записью (CASCADE)
+    if raw:
+        return
+    from .refs import change_refs
+    from .search import index_arxiv
+    from .stats import apply_changes, stat_key
+
+    index_arxiv(instance)
+    apply_changes(getattr(instance, "_stat_old", []), [stat_key(instance)])
+    old_pdf = getattr(instance, "_pdf_old", None)
+    if old_pdf != instance.pdf_id:
+        # старый PDF, если он больше никому не нужен, удалит сборщик (arxiv/refs.py)
+        change_refs(old_pdf, -1)
+        change_refs(instance.pdf_id, 1)
+    instance._stat_old = []
+    instance._pdf_old = instance.pdf_id
+
+
+@receiver(pre_save, sender=Arxiv)
+def arxiv_before_save(sender, instance, raw=False, **kwargs):
+    # старые измерения статистики и PDF — чтобы в post_save перенести счётчики
+    instance._stat_old = []
+    instance._pdf_old = None
+    if raw or instance.pk is None:
+        return
+    from .stats import STAT_FIELDS, stat_key
+
+    old = Arxiv.objects.filter(pk=instance.pk).values(*STAT_FIELDS, "pdf_id").first()
+    if old:
+        instance._stat_old = [stat_key(old)]
+        instance._pdf_old = old["pdf_id"]
+
+
+@receiver(post_delete, sender=Arxiv)
+def arxiv_deleted(sender, instance, **kwargs):
+    from .refs import change_refs
+    from .stats import apply_changes, stat_key
+
+    apply_changes([stat_key(instance)], [])
+    change_refs(instance.pdf_id, -1)
+
+
+def lookup_changed(sender, **kwargs):
+    from .lookups import bump_version
+
+    bump_version(sender)
+
+
+def connect_lookup_signals():
+    from .lookups import LOOKUP_MODELS
+
+    for model in LOOKUP_MODELS:
+        post_save.connect(lookup_changed, sender=model, dispatch_uid=f"lookup_save_{model.__name__}")
+        post_delete.connect(lookup_changed, sender=model, dispatch_uid=f"lookup_delete_{model.__name__}")
+
+
+connect_lookup_signals()
+
+
+def archive_changed(sender, **kwargs):
+    # новое поколение — закэшированные страницы списка больше не читаются
+    from .pagecache import bump_generation
+
+    bump_generation()
+
+
+def connect_generation_signals():
+    from .lookups import LOOKUP_MODELS
+
+    for model in (Arxiv, PdfStorage, *LOOKUP_MODELS):
+        post_save.connect(archive_changed, sender=model, dispatch_uid=f"generation_save_{model.__name__}")
+        post_delete.connect(archive_changed, sender=model, dispatch_uid=f"generation_delete_{model.__name__}")
+
+
+connect_generation_signals()
+
+
+def connect_metrics_signals():
+    # счётчик SQL-запросов для MetricsMiddleware — на каждое новое соединение
+    from .metrics import install_sql_wrapper
+
+    connection_created.connect(install_sql_wrapper, dispatch_uid="arxiv_metrics_sql")
+
+
+connect_metrics_signals()
@@ -0,0 +1,117 @@
+"""
+Сводная статистика архива (таблица arxiv_stat).
+
+Одна строка — количество записей Arxiv с одинаковыми region, district, prog,
+object_type, is_mutch и месяцем reg_date. Счётчики меняются на ±1 при
+создании/изменении/удалении записи (см. arxiv/signals.py), поэтому дашборд
+читает только маленькую сводную таблицу, а не делает GROUP BY по всему arxiv.
+Если счётчики разошлись (правка в обход ORM) — manage.py rebuild_arxiv_stats.
+"""
+import datetime
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+
+from .filters import parse_id
+from .models import ArxivStat
+
+KEY_FIELDS = ("region_id", "district_id", "prog_id", "object_type_id", "is_mutch", "month")
+# поля Arxiv, из которых собирается ключ
+STAT_FIELDS = ("region_id", "district_id", "prog_id", "object_type_id", "is_mutch", "reg_date")
+
+# группировка для дашборда/JSON -> (поле ArxivStat, поле с названием)
+GROUPS = {
+    "region": ("region_id", "region__name"),
+    "district": ("district_id", "district__name"),
+    "prog": ("prog_id", "prog__prog_name"),
+    "object_type": ("object_type_id", "object_type__name"),
+    "is_mutch": ("is_mutch", None),
+    "month": ("month", None),
+}
+
+
+def month_start(value):
+    if isinstance(value, str):
+        value = datetime.date.fromisoformat(value)
+    return value.replace(day=1)
+
+
+def stat_key(arxiv):
+    # arxiv — модель или dict из values()
+    get = arxiv.get if isinstance(arxiv, dict) else lambda name: getattr(arxiv, name)
+    return (
+        get("region_id"), get("district_id"), get("prog_id"), get("object_type_id"),
+        bool(get("is_mutch")), month_start(get("reg_date")),
+    )
+
+
+def apply_delta(key, delta):
+    if not delta:
+        return
+    lookup = dict(zip(KEY_FIELDS, key))
+    with transaction.atomic():
+        updated = ArxivStat.objects.filter(**lookup).update(count=F("count") + delta)
+        if not updated and delta > 0:
+            try:
+                with transaction.atomic():
+                    ArxivStat.objects.create(count=delta, **lookup)
+            except IntegrityError:
+                # строку успел создать параллельный запрос
+                ArxivStat.objects.filter(**lookup).update(count=F("count") + delta)
+        if delta < 0:
+            ArxivStat.objects.filter(count__lte=0, **lookup).delete()
+
+
+def apply_changes(old_keys, new_keys):
+    """old_keys/new_keys — списки stat_key до и после изменения (удаление/вставка — пустой список)."""
+    delta = Counter(new_keys)
+    delta.subtract(Counter(old_keys))
+    for key, n in delta.items():
+        apply_delta(key, n)
+
+
+def stat_rows(qs):
+    # значения для stat_key без загрузки моделей
+    return qs.values(*STAT_FIELDS)
+
+
+def summary(group, filters=None):
+    """[{"key", "label", "count"}] по одной группировке, только из arxiv_stat."""
+    field, label = GROUPS[group]
+    qs = ArxivStat.objects.filter(**(filters or {}))
+    values = [field] + ([label] if label else [])
+    rows = qs.values(*values).annotate(total=Sum("count")).order_by(field)
+    result = []
+    for row in rows:
+        key = row[field]
+        if label:
+            text = row[label]
+        elif group == "month":
+            text = key.strftime("%Y-%m")
+        else:
+            text = "Muvofiq" if key else "Muvofiq emas"
+        result.append({"key": key.isoformat() if group == "month" else key, "label": text, "count": row["total"]})
+    return result
+
+
+def total(filters=None):
+    return ArxivStat.objects.filter(**(filters or {})).aggregate(n=Sum("count"))["n"] or 0
+
+
+def stat_filters(params):
+    """Фильтры дашборда из GET: region, district, prog, object_type (id), is_mutch (0/1), year."""
+    filters = {}
+    for name in ("region", "district", "prog", "object_type"):
+        value = parse_id(params.get(name))
+        if value is not None:
+            filters[f"{name}_id"] = value
+    if params.get("is_mutch") in ("0", "1"):
+        filters["is_mutch"] = params["is_mutch"] == "1"
+    try:
+        year = int(params["year"])
+        filters["month__gte"] = datetime.date(year, 1, 1)
+        filters["month__lt"] = datetime.date(year + 1, 1, 1)
+    except (KeyError, TypeError, ValueError, OverflowError):
+        pass
+    return filters
@@ -0,0 +1,280 @@
+import asyncio
+import hashlib
+import mmap
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import BinaryField
+from django.db.models.functions import Substr
+
+from .compression import aiter_decompressed, aslice_stream, compress_chunks, iter_decompressed, slice_stream
+from .metrics import add_blob_bytes
+from .models import PdfStorage
+from .refs import touch
+
+# Размер одного куска при чтении BLOB из БД (байты)
+CHUNK_SIZE = getattr(settings, "ARXIV_PDF_CHUNK_SIZE", 512 * 1024)
+# "до конца BLOB" для сжатых: их длина в байтах заранее не известна
+BLOB_END = 2 ** 40
+
+
+def _db_chunk_qs(pdf_id, offset, length, using=None):
+    # SUBSTRING(content, pos, len) — БД отдаёт только нужный кусок, а не весь LONGBLOB
+    return (
+        PdfStorage.objects.db_manager(using)
+        .filter(pk=pdf_id)
+        .annotate(chunk=Substr("content", offset + 1, length, output_field=BinaryField()))
+        .values_list("chunk", flat=True)
+    )
+
+
+def read_db_chunk(pdf_id, offset, length, using=None):
+    chunk = _db_chunk_qs(pdf_id, offset, length, using).first()
+    chunk = bytes(chunk) if chunk is not None else b""
+    add_blob_bytes(len(chunk))
+    return chunk
+
+
+def iter_db_chunks(pdf_id, start, end, chunk_size=CHUNK_SIZE, using=None):
+    # Отдаём байты [start, end] (включительно) кусками по chunk_size
+    pos = start
+    while pos <= end:
+        length = min(chunk_size, end - pos + 1)
+        chunk = read_db_chunk(pdf_id, pos, length, using)
+        if not chunk:
+            break
+        yield chunk
+        pos += len(chunk)
+
+
+async def aiter_db_chunks(pdf_id, start, end, chunk_size=CHUNK_SIZE, using=None):
+    # то же для ASGI: каждый кусок — отдельный await, event loop не блокируется
+    pos = start
+    while pos <= end:
+        length = min(chunk_size, end - pos + 1)
+        chunk = await _db_chunk_qs(pdf_id, pos, length, using).afirst()
+        if not chunk:
+            break
+        add_blob_bytes(len(chunk))
+        yield bytes(chunk)
+        pos += len(chunk)
+
+
+class DatabaseBlobStorage:
+    """PDF хранится в pdf_storage.content (LONGBLOB)."""
+
+    name = PdfStorage.STORAGE_DB
+
+    def save(self, pdf, file):
+        # INSERT уходит одним пакетом, так что готовый BLOB целиком в памяти.
+        # Для больших архивов используйте ARXIV_PDF_STORAGE = "fs".
+        pdf.codec, pdf.content = compress_chunks(file.chunks())
+        if not pdf.codec:
+            # сжатие не окупилось — файл перечитывается (chunks() начинает с начала)
+            pdf.content = b"".join(file.chunks())
+        pdf.storage = self.name
+
+    def supports_range(self, pdf):
+        # сжатый BLOB распаковывается только с начала: каждый Range дочитывал бы
+        # весь PDF до start, а просмотрщик шлёт их десятки — отдаём целиком
+        return not pdf.codec
+
+    def iter_chunks(self, pdf, start, end, chunk_size=CHUNK_SIZE):
+        # BLOB читаем из той же БД, откуда пришли метаданные (реплика или primary)
+        if not pdf.codec:
+            return iter_db_chunks(pdf.pk, start, end, chunk_size, pdf._state.db)
+        # сжатый BLOB распаковывается только с начала — кусок дочитывается до start
+        raw = iter_db_chunks(pdf.pk, 0, BLOB_END, chunk_size, pdf._state.db)
+        return slice_stream(iter_decompressed(pdf.codec, raw, chunk_size), start, end)
+
+    def aiter_chunks(self, pdf, start, end, chunk_size=CHUNK_SIZE):
+        if not pdf.codec:
+            return aiter_db_chunks(pdf.pk, start, end, chunk_size, pdf._state.db)
+        raw = aiter_db_chunks(pdf.pk, 0, BLOB_END, chunk_size, pdf._state.db)
+        return aslice_stream(aiter_decompressed(pdf.codec, raw, chunk_size), start, end)
+
+    def delete(self, pdf):
+        # BLOB удаляется вместе со строкой
+        pass
+
+
+class FileSystemBlobStorage:
+    """
+    PDF хранится файлом на диске, путь берётся из sha256:
+    <root>/ab/cd/abcd...  — один файл на одно содержимое.
+    """
+
+    name = PdfStorage.STORAGE_FS
+
+    def __init__(self, root=None):
+        self.root = Path(root or settings.ARXIV_PDF_ROOT)
+
+    def path(self, sha256):
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    def exists(self, sha256):
+        return self.path(sha256).exists()
+
+    def write(self, sha256, chunks):
+        # Пишем во временный файл рядом и переименовываем — файл либо целый, либо его нет
+        target = self.path(sha256)
+        if target.exists():
+            return target
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return target
+
+    def link(self, sha256, src):
+        # Временный файл загрузки просто привязываем жёсткой ссылкой — без копирования.
+        # Если хранилище на другом разделе — копируем кусками.
+        target = self.path(sha256)
+        if target.exists():
+            return target
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.parent / f".tmp-{os.getpid()}-{os.path.basename(src)}"
+        try:
+            os.link(src, tmp)
+        except OSError:
+            with open(src, "rb") as f:
+                return self.write(sha256, iter(lambda: f.read(CHUNK_SIZE), b""))
+        os.replace(tmp, target)
+        return target
+
+    def save(self, pdf, file):
+        if hasattr(file, "temporary_file_path"):
+            self.link(pdf.sha256, file.temporary_file_path())
+        else:
+            self.write(pdf.sha256, file.chunks())
+        pdf.content = b""
+        pdf.codec = ""
+        pdf.storage = self.name
+
+    def supports_range(self, pdf):
+        return True
+
+    def open(self, pdf):
+        # Целый файл отдаём через FileResponse — сервер может использовать sendfile
+        return open(self.path(pdf.sha256), "rb")
+
+    def iter_chunks(self, pdf, start, end, chunk_size=CHUNK_SIZE):
+        # Диапазоны читаем через mmap: в памяти процесса только текущий кусок
+        with open(self.path(pdf.sha256), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                end = min(end, len(mm) - 1)
+                pos = start
+                while pos <= end:
+                    length = min(chunk_size, end - pos + 1)
+                    add_blob_bytes(length)
+                    yield mm[pos:pos + length]
+                    pos += length
+
+    async def aiter_chunks(self, pdf, start, end, chunk_size=CHUNK_SIZE):
+        # чтение с диска — в потоках, event loop свободен
+        f = await asyncio.to_thread(open, self.path(pdf.sha256), "rb")
+        try:
+            await asyncio.to_thread(f.seek, start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await asyncio.to_thread(f.read, min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                add_blob_bytes(len(chunk))
+                yield chunk
+        finally:
+            f.close()
+
+    def delete(self, pdf):
+        if pdf.sha256:
+            try:
+                self.path(pdf.sha256).unlink()
+            except FileNotFoundError:
+                pass
+
+
+BACKENDS = {
+    PdfStorage.STORAGE_DB: DatabaseBlobStorage,
+    PdfStorage.STORAGE_FS: FileSystemBlobStorage,
+}
+
+
+def get_backend(name=None):
+    # name=None — бэкенд для новых загрузок (ARXIV_PDF_STORAGE)
+    name = name or getattr(settings, "ARXIV_PDF_STORAGE", PdfStorage.STORAGE_DB)
+    return BACKENDS[name]()
+
+
+def backend_for(pdf):
+    return get_backend(pdf.storage)
+
+
+def open_blob(pdf):
+    """
+    Файловый объект с содержимым PDF (для разбора в фоне).
+    С диска — сам файл, из БД — кусками во временный файл.
+    """
+    if pdf.storage == PdfStorage.STORAGE_FS:
+        return FileSystemBlobStorage().open(pdf)
+    f = tempfile.SpooledTemporaryFile(max_size=4 * CHUNK_SIZE)
+    if pdf.file_size:
+        for chunk in backend_for(pdf).iter_chunks(pdf, 0, pdf.file_size - 1):
+            f.write(chunk)
+    f.seek(0)
+    return f
+
+
+def file_sha256(file):
+    # HashingFileUploadHandler уже посчитал хэш при приёме загрузки
+    sha256 = getattr(file, "sha256", None)
+    if sha256:
+        return sha256
+    hasher = hashlib.sha256()
+    for chunk in file.chunks():
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def save_pdf(uploaded_file, user=None):
+    """
+    Сохраняет загруженный PDF (или возвращает уже существующий с тем же sha256).
+    Если такой PDF уже есть — содержимое файла больше не читается и не пишется.
+    """
+    sha256 = file_sha256(uploaded_file)
+
+    existing = PdfStorage.objects.metadata().filter(sha256=sha256).first()
+    if existing:
+        # мог уже стать сиротой — не даём сборщику удалить его прямо сейчас
+        touch(existing)
+        return existing
+
+    pdf = PdfStorage(
+        file_name=uploaded_file.name,
+        mime_type="application/pdf",
+        file_size=uploaded_file.size,
+        sha256=sha256,
+        uploaded_by=user,
+    )
+    get_backend().save(pdf, uploaded_file)
+    try:
+        with transaction.atomic():
+            pdf.save()
+    except IntegrityError:
+        # тот же файл параллельно загрузил кто-то ещё
+        return PdfStorage.objects.metadata().get(sha256=sha256)
+    return pdf
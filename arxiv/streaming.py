@@ -0,0 +1,119 @@
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .metrics import add_blob_bytes
+from .storage import backend_for
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Содержимое PdfStorage по id никогда не меняется — можно кэшировать надолго
+CACHE_CONTROL = getattr(
+    settings, "ARXIV_PDF_CACHE_CONTROL", "private, max-age=31536000, immutable"
+)
+
+
+def parse_range(header, size):
+    """
+    Разбирает заголовок Range для одного диапазона.
+    Возвращает (start, end) включительно, None — отдать файл целиком,
+    "invalid" — диапазон за пределами файла (416).
+    """
+    if not header:
+        return None
+    m = RANGE_RE.match(header.strip())
+    if not m:
+        # несколько диапазонов или мусор — по RFC 9110 можно отдать весь файл
+        return None
+
+    first, last = m.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # bytes=-500 — последние 500 байт
+        length = int(last)
+        if length == 0:
+            return "invalid"
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return "invalid"
+    return start, min(end, size - 1)
+
+
+def pdf_etag(pdf):
+    # Сильный ETag прямо из sha256 — считать ничего не нужно
+    return f'"{pdf.sha256}"' if pdf.sha256 else None
+
+
+def set_cache_headers(resp, etag, last_modified):
+    if etag:
+        resp["ETag"] = etag
+    resp["Last-Modified"] = http_date(last_modified)
+    resp["Cache-Control"] = CACHE_CONTROL
+    return resp
+
+
+def pdf_response(request, pdf, disposition="inline", use_async=False):
+    """
+    Потоковый ответ с PDF из PdfStorage: содержимое читается кусками
+    из бэкенда хранения, поддерживаются Range-запросы (206 Partial Content),
+    кроме сжатых в БД PDF — они отдаются целиком.
+    If-None-Match / If-Modified-Since отвечаются 304 без чтения содержимого.
+    pdf — объект без поля content (см. PdfStorage.objects.metadata()).
+    use_async — тело ответа асинхронным итератором (для ASGI, см. async_views).
+    """
+    size = pdf.file_size
+    content_type = pdf.mime_type or "application/pdf"
+    etag = pdf_etag(pdf)
+    last_modified = int(pdf.created_at.timestamp())
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return set_cache_headers(not_modified, etag, last_modified)
+
+    backend = backend_for(pdf)
+    ranges = backend.supports_range(pdf)
+    # без поддержки Range заголовок игнорируется — по RFC 9110 это ответ 200 целиком
+    byte_range = parse_range(request.META.get("HTTP_RANGE"), size) if ranges else None
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if byte_range and if_range and if_range not in (etag, http_date(last_modified)):
+        # файл изменился с момента первой части — отдаём целиком
+        byte_range = None
+    if byte_range == "invalid":
+        resp = HttpResponse(status=416)
+        resp["Content-Range"] = f"bytes */{size}"
+        resp["Accept-Ranges"] = "bytes"
+        return resp
+
+    if byte_range is None:
+        start, end, status = 0, size - 1, 200
+    else:
+        (start, end), status = byte_range, 206
+
+    if request.method == "HEAD" or size == 0:
+        resp = StreamingHttpResponse(iter(()), content_type=content_type, status=status)
+    elif use_async:
+        body = backend.aiter_chunks(pdf, start, end)
+        resp = StreamingHttpResponse(body, content_type=content_type, status=status)
+    elif status == 200 and hasattr(backend, "open"):
+        resp = FileResponse(backend.open(pdf), content_type=content_type)
+        add_blob_bytes(size)  # файл целиком отдаст сервер (sendfile)
+    else:
+        body = backend.iter_chunks(pdf, start, end)
+        resp = StreamingHttpResponse(body, content_type=content_type, status=status)
+    resp["Content-Length"] = str(end - start + 1 if size else 0)
+    resp["Accept-Ranges"] = "bytes" if ranges else "none"
+    if status == 206:
+        resp["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    filename = pdf.file_name or "document.pdf"
+    resp["Content-Disposition"] = f"{disposition}; filename*=UTF-8''{quote(filename)}"
+    return set_cache_headers(resp, etag, last_modified)
@@ -1,3 +1,569 @@
+import datetime
+import hashlib
+import itertools
+import json
+import unittest
+import zlib
+from collections import Counter
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.http import QueryDict
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from . import api, refs
+from .bulk import bulk_edit
+from .filters import DATE_SORTS, INDEXED_FILTERS, SORTS, filter_arxiv, list_ordering
+from .lookups import cached_objects, lookup_version
+from .models import Arxiv, ArxivStat, District, ObjectType, PdfStorage, Prog, Region
+from .pagination import LAST, keyset_q, paginate_keyset
+from .search import search_arxiv
+from .stats import KEY_FIELDS, stat_filters, stat_key, stat_rows
+from .streaming import parse_range
+from .views import bulk_selection
+
+
+def make_lookups():
+    # версии справочников меняются после коммита — в TestCase коммита нет, вызываем сами
+    with TestCase.captureOnCommitCallbacks(execute=True):
+        region = Region.objects.create(name="Toshkent")
+        return {
+            "prog": Prog.objects.create(prog_name="Obod mahalla"),
+            "region": region,
+            "district": District.objects.create(name="Chilonzor", region=region),
+            "object_type": ObjectType.objects.create(name="Maktab"),
+        }
+
+
+def make_arxiv(lookups, reg_num, **kwargs):
+    data = {
+        "reg_num": reg_num, "reg_date": datetime.date(2024, 3, 15), "customer": "Hokimiyat",
+        "object_name": "Maktab binosi", "work_type": "Sinov", "signed_person": "A",
+        "branch_manager": "B", "specialist": "C", **lookups, **kwargs,
+    }
+    return Arxiv.objects.create(**data)
+
+
+def make_pdf(data):
+    return PdfStorage.objects.create(
+        file_name="akt.pdf", file_size=len(data), sha256=hashlib.sha256(data).hexdigest(), content=data,
+    )
+
+
+def stat_counts():
+    """Счётчики из arxiv_stat и то, что должно там быть по самой таблице arxiv."""
+    stored = {tuple(row[:-1]): row[-1] for row in ArxivStat.objects.values_list(*KEY_FIELDS, "count")}
+    expected = dict(Counter(stat_key(row) for row in stat_rows(Arxiv.objects.all())))
+    return stored, expected
+
+
+def plan_problems(qs):
+    """Что в плане запроса говорит о сортировке вне индекса или полном проходе по arxiv."""
+    if connection.vendor == "sqlite":
+        plan = qs.explain()
+        # строки вида "4 0 0 SCAN arxiv USING INDEX ..."; SEARCH — поиск по индексу
+        problems = [line for line in plan.splitlines() if "TEMP B-TREE" in line]
+        full_scan = any(" SCAN arxiv" in f" {line}" for line in plan.splitlines())
+        return problems, full_scan, plan
+
+    plan = json.loads(qs.explain(format="json"))
+    problems, access = [], []
+
+    def walk(node):
+        if isinstance(node, dict):
+            for key in ("using_filesort", "using_temporary_table"):
+                if node.get(key):
+                    problems.append(key)
+            if node.get("table_name") == "arxiv":
+                access.append(node.get("access_type"))
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    walk(plan)
+    return problems, "ALL" in access or "index" in access, json.dumps(plan, indent=1)
+
+
+@unittest.skipUnless(connection.vendor in ("sqlite", "mysql"), "EXPLAIN разбирается только для SQLite и MySQL")
+class ArxivListIndexTests(TestCase):
+    """
+    Каждое сочетание фильтров и сортировки списка (filters.py) читает arxiv
+    по составному индексу в нужном порядке: без filesort / TEMP B-TREE,
+    а при фильтре по справочнику — поиском по индексу, а не полным проходом.
+    Исключение — диапазон дат с явно выбранной сортировкой не по дате:
+    её пользователь выбрал сам, и она соблюдается ценой сортировки.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        regions = [Region.objects.create(name=f"Viloyat {i}") for i in range(3)]
+        districts = [District.objects.create(name=f"Tuman {i}", region=regions[i % 3]) for i in range(6)]
+        progs = [Prog.objects.create(prog_name=f"Dastur {i}") for i in range(3)]
+        types = [ObjectType.objects.create(name=f"Tur {i}") for i in range(3)]
+        # строк побольше — чтобы оптимизатор MySQL не предпочёл полный проход крошечной таблицы
+        Arxiv.objects.bulk_create([
+            Arxiv(
+                reg_num=f"T-{i:05d}", reg_date=datetime.date(2020, 1, 1) + datetime.timedelta(days=i % 1500),
+                customer=f"Buyurtmachi {i % 97}", prog=progs[i % 3], region=districts[i % 6].region,
+                district=districts[i % 6], object_type=types[i % 3], object_name="obyekt", work_type="Sinov",
+                signed_person="A", branch_manager="B", specialist="C", is_mutch=i % 5 != 0,
+            )
+            for i in range(2000)
+        ])
+        cls.sample = {
+            "region": districts[0].region_id, "district": districts[0].id,
+            "prog": progs[0].id, "object_type": types[0].id,
+        }
+
+    def combinations(self):
+        for n in range(len(INDEXED_FILTERS) + 1):
+            for names in itertools.combinations(INDEXED_FILTERS, n):
+                for is_mutch, dates, sort in itertools.product(("", "1"), (False, True), ("", *SORTS)):
+                    if dates and sort and sort not in DATE_SORTS:
+                        continue
+                    params = QueryDict(mutable=True)
+                    for name in names:
+                        params[name] = self.sample[name]
+                    if is_mutch:
+                        params["is_mutch"] = is_mutch
+                    if dates:
+                        params["date_from"], params["date_to"] = "2021-01-01", "2022-06-30"
+                    if sort:
+                        params["sort"] = sort
+                    yield names, params
+
+    def test_list_filters_use_indexes(self):
+        base = Arxiv.objects.select_related("prog", "region", "district", "object_type")
+        last = Arxiv.objects.order_by("id")[1000]
+        checked = 0
+        for names, params in self.combinations():
+            qs, filters = filter_arxiv(base, params)
+            ordering = list_ordering(qs, filters)
+            first_page = qs.order_by(*ordering)[:11]
+            # следующая страница — условие keyset-курсора по той же сортировке
+            values = [getattr(last, f.lstrip("-")) for f in ordering]
+            next_page = qs.order_by(*ordering).filter(keyset_q(ordering, values))[:11]
+
+            for page, page_qs in (("first", first_page), ("next", next_page)):
+                with self.subTest(params=params.urlencode(), page=page):
+                    problems, full_scan, plan = plan_problems(page_qs)
+                    self.assertEqual(problems, [], plan)
+                    if names:
+                        self.assertFalse(full_scan, plan)
+                    checked += 1
+        self.assertGreater(checked, 0)
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        lookups = make_lookups()
+        cls.a2023 = make_arxiv(lookups, "ZZ-2023-024")
+        cls.a2024 = make_arxiv(lookups, "ZZ-2024-001")
+        cls.split = make_arxiv(lookups, "R-1", customer="abcx ybcd")
+        cls.exact = make_arxiv(lookups, "R-2", customer="Abcd MChJ")
+        cls.apostrophe = make_arxiv(lookups, "R-3", object_name="G‘ijduvon maktabi")
+        cls.cyrillic = make_arxiv(lookups, "C-1", customer="ИП Королёв", object_name="Мактаб Тошкент")
+
+    def found(self, q, field="all"):
+        return set(search_arxiv(Arxiv.objects.all(), q, field).values_list("reg_num", flat=True))
+
+    def test_trigram_overlap_is_not_a_match(self):
+        # триграммы "202", "024" есть в обоих номерах, подстрока "2024" — только во втором
+        self.assertEqual(self.found("2024"), {"ZZ-2024-001"})
+        self.assertEqual(self.found("abcd"), {"R-2"})
+
+    def test_field_and_case(self):
+        self.assertEqual(self.found("ABCD", "customer"), {"R-2"})
+        self.assertEqual(self.found("abcd", "reg_num"), set())
+        self.assertEqual(self.found("zz 001"), {"ZZ-2024-001"})
+
+    def test_short_words_and_apostrophes(self):
+        self.assertEqual(self.found("R-"), {"R-1", "R-2", "R-3"})
+        self.assertEqual(self.found("g'ijduvon"), {"R-3"})
+
+    def test_cyrillic_case_and_yo(self):
+        for q in ("тошкент", "ТОШКЕНТ", "Тошкент", "мактаб", "королев", "королёв", "КОРОЛЁВ тошкент"):
+            with self.subTest(q=q):
+                self.assertEqual(self.found(q), {"C-1"})
+        self.assertEqual(self.found("королёва"), set())
+
+
+class FilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.arxiv = make_arxiv(make_lookups(), "F-1")
+
+    def test_out_of_range_id_is_ignored(self):
+        for value in ("99999999999999999999", "-99999999999999999999", "1e3", "x"):
+            with self.subTest(value=value):
+                qs, filters = filter_arxiv(Arxiv.objects.all(), QueryDict(f"region={value}"))
+                self.assertIsNone(filters["region"])
+                self.assertEqual(list(qs), [self.arxiv])
+
+    def test_dates_keep_chosen_sort(self):
+        for query, sort in (("date_from=2024-01-01", "-reg_date"),
+                            ("date_from=2024-01-01&sort=customer", "customer"),
+                            ("date_from=2024-01-01&q=maktab", "")):
+            with self.subTest(query=query):
+                _, filters = filter_arxiv(Arxiv.objects.all(), QueryDict(query))
+                self.assertEqual(filters["sort"], sort)
+
+    def test_unknown_id_matches_nothing(self):
+        qs, filters = filter_arxiv(Arxiv.objects.all(), QueryDict(f"region={2**63 - 1}"))
+        self.assertEqual(filters["region"], 2**63 - 1)
+        self.assertEqual(list(qs), [])
+
+
+class LookupCacheTests(TestCase):
+    def test_version_changes_after_commit(self):
+        before = lookup_version(Region)
+        with self.captureOnCommitCallbacks(execute=True):
+            Region.objects.create(name="Xorazm")
+            self.assertEqual(lookup_version(Region), before)
+        after = lookup_version(Region)
+        self.assertNotEqual(after, before)
+        self.assertIn("Xorazm", [r.name for r in cached_objects(Region)])
+
+    def test_rollback_keeps_version(self):
+        before = lookup_version(Region)
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                Region.objects.create(name="Xorazm")
+                Region.objects.create(name="Xorazm")
+        self.assertEqual(lookup_version(Region), before)
+
+
+class RangeTests(TestCase):
+    data = bytes(range(256)) * 4
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("reader", password="x")
+        cls.pdf = make_pdf(cls.data)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.url = reverse("pdf_view", args=[self.pdf.pk])
+
+    def get(self, **headers):
+        resp = self.client.get(self.url, headers=headers)
+        body = b"".join(resp.streaming_content) if resp.streaming else resp.content
+        return resp, body
+
+    def test_parse_range(self):
+        cases = {
+            "bytes=0-9": (0, 9),
+            "bytes=90-": (90, 99),
+            "bytes=-10": (90, 99),
+            "bytes=-500": (0, 99),
+            "bytes=95-200": (95, 99),
+            "bytes=100-": "invalid",
+            "bytes=5-2": "invalid",
+            "bytes=-0": "invalid",
+            "bytes=0-1,5-6": None,
+            "items=0-9": None,
+            "bytes=-": None,
+            "": None,
+            None: None,
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(parse_range(header, 100), expected)
+
+    def test_partial_content(self):
+        resp, body = self.get(range="bytes=10-19")
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(body, self.data[10:20])
+        self.assertEqual(resp["Content-Range"], f"bytes 10-19/{len(self.data)}")
+        self.assertEqual(resp["Content-Length"], "10")
+
+        resp, body = self.get(range="bytes=-5")
+        self.assertEqual(body, self.data[-5:])
+
+    def test_unsatisfiable_range(self):
+        resp, _ = self.get(range=f"bytes={len(self.data)}-")
+        self.assertEqual(resp.status_code, 416)
+        self.assertEqual(resp["Content-Range"], f"bytes */{len(self.data)}")
+
+    def test_conditional_requests(self):
+        etag = f'"{self.pdf.sha256}"'
+        resp, body = self.get(if_none_match=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(body, b"")
+
+        # If-Range совпал — часть, не совпал (файл другой) — целиком
+        resp, body = self.get(range="bytes=0-3", if_range=etag)
+        self.assertEqual((resp.status_code, body), (206, self.data[:4]))
+        resp, body = self.get(range="bytes=0-3", if_range='"other"')
+        self.assertEqual((resp.status_code, body), (200, self.data))
+
+    def test_compressed_blob_is_sent_whole(self):
+        data = b"%PDF-1.4 " + b"0 0 obj " * 500
+        pdf = PdfStorage.objects.create(
+            file_name="akt.pdf", file_size=len(data), sha256=hashlib.sha256(data).hexdigest(),
+            content=zlib.compress(data), codec="zlib",
+        )
+        resp = self.client.get(reverse("pdf_view", args=[pdf.pk]), headers={"range": "bytes=10-19"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Accept-Ranges"], "none")
+        self.assertEqual(b"".join(resp.streaming_content), data)
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        lookups = make_lookups()
+        # повторяющиеся даты — порядок внутри дня держит id
+        for i in range(23):
+            make_arxiv(lookups, f"K-{i:02d}", reg_date=datetime.date(2024, 1, 1) + datetime.timedelta(days=i // 3))
+        cls.ordering = ["-reg_date", "-id"]
+        cls.expected = list(Arxiv.objects.order_by(*cls.ordering).values_list("pk", flat=True))
+
+    def page(self, cursor, per_page=5, ordering=None):
+        return paginate_keyset(Arxiv.objects.all(), ordering or self.ordering, cursor, per_page)
+
+    def test_forward_and_back(self):
+        pages, cursor = [], None
+        while True:
+            page = self.page(cursor)
+            pages.append([a.pk for a in page])
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual([pk for p in pages for pk in p], self.expected)
+        self.assertEqual([len(p) for p in pages], [5, 5, 5, 5, 3])
+
+        back = []
+        while page.has_previous:
+            page = self.page(page.prev_cursor)
+            back.insert(0, [a.pk for a in page])
+        self.assertEqual(back, pages[:-1])
+        self.assertFalse(self.page(None).has_previous)
+
+    def test_last_page(self):
+        page = self.page(LAST)
+        self.assertEqual([a.pk for a in page], self.expected[-5:])
+        self.assertFalse(page.has_next)
+        self.assertTrue(page.has_previous)
+        previous = self.page(page.prev_cursor)
+        self.assertEqual([a.pk for a in previous], self.expected[-10:-5])
+        self.assertTrue(previous.has_next)
+
+    def test_foreign_or_broken_cursor_starts_over(self):
+        cursor = self.page(None, ordering=["reg_num"]).next_cursor
+        for token in (cursor, "garbage", cursor[:-2] + "xx"):
+            with self.subTest(token=token):
+                self.assertEqual([a.pk for a in self.page(token)], self.expected[:5])
+
+
+class StatCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.lookups = make_lookups()
+
+    def assertStatsConsistent(self):
+        stored, expected = stat_counts()
+        self.assertEqual(stored, expected)
+
+    def test_create_edit_delete(self):
+        a = make_arxiv(self.lookups, "S-1")
+        b = make_arxiv(self.lookups, "S-2")
+        self.assertEqual(list(ArxivStat.objects.values_list("count", flat=True)), [2])
+
+        # другой месяц и другой признак — запись переезжает в новую группу
+        a.reg_date, a.is_mutch = datetime.date(2024, 5, 2), True
+        a.save()
+        self.assertStatsConsistent()
+        self.assertEqual(ArxivStat.objects.count(), 2)
+
+        # изменение вне ключа статистики счётчики не трогает
+        b.customer = "Boshqa"
+        b.save()
+        self.assertStatsConsistent()
+
+        a.delete()
+        self.assertStatsConsistent()
+        b.delete()
+        self.assertFalse(ArxivStat.objects.exists())
+
+    def test_filters_ignore_bad_ids(self):
+        params = QueryDict("region=99999999999999999999&district=-3&prog=x&object_type=7&is_mutch=1")
+        self.assertEqual(stat_filters(params), {"object_type_id": 7, "is_mutch": True})
+
+
+class PdfRefTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.lookups = make_lookups()
+
+    def refresh(self, pdf):
+        return PdfStorage.objects.metadata().get(pk=pdf.pk)
+
+    def test_ref_count(self):
+        pdf = make_pdf(b"%PDF-1 a")
+        a = make_arxiv(self.lookups, "P-1", pdf=pdf)
+        b = make_arxiv(self.lookups, "P-2", pdf=pdf)
+        pdf = self.refresh(pdf)
+        self.assertEqual((pdf.ref_count, pdf.orphaned_at), (2, None))
+
+        a.pdf = None
+        a.save()
+        self.assertEqual(self.refresh(pdf).ref_count, 1)
+        b.delete()
+        pdf = self.refresh(pdf)
+        self.assertEqual(pdf.ref_count, 0)
+        self.assertIsNotNone(pdf.orphaned_at)
+
+    def test_gc_deletes_orphans_after_grace(self):
+        kept = make_pdf(b"%PDF-1 kept")
+        make_arxiv(self.lookups, "P-1", pdf=kept)
+        orphan = make_pdf(b"%PDF-1 orphan")
+        fresh = make_pdf(b"%PDF-1 fresh")
+        PdfStorage.objects.filter(pk=orphan.pk).update(orphaned_at=timezone.now() - datetime.timedelta(days=1))
+
+        deleted, reclaimed, skipped = refs.collect_batch(10, grace=datetime.timedelta(hours=1))
+        self.assertEqual((deleted, reclaimed, skipped), (1, len(b"%PDF-1 orphan"), 0))
+        self.assertEqual(set(PdfStorage.objects.values_list("pk", flat=True)), {kept.pk, fresh.pk})
+
+    def test_gc_skips_reattached_pdf(self):
+        pdf = make_pdf(b"%PDF-1 race")
+        PdfStorage.objects.filter(pk=pdf.pk).update(orphaned_at=timezone.now() - datetime.timedelta(days=1))
+        # запись привязала PDF уже после того, как сборщик выбрал его в кандидаты
+        make_arxiv(self.lookups, "P-1", pdf=pdf)
+        stale = PdfStorage.objects.metadata().filter(pk=pdf.pk)
+        with mock.patch.object(refs, "orphans", lambda grace: stale):
+            self.assertEqual(refs.collect_batch(10, grace=datetime.timedelta(0)), (0, 0, 1))
+        self.assertTrue(PdfStorage.objects.filter(pk=pdf.pk).exists())
+
+        # задача pdf_gc по тому же PDF тоже ничего не удаляет
+        refs.collect_pdf(pdf.pk)
+        self.assertTrue(PdfStorage.objects.filter(pk=pdf.pk).exists())
+
+
+class BulkEditTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.lookups = make_lookups()
+        cls.region = Region.objects.create(name="Samarqand")
+        cls.district = District.objects.create(name="Urgut", region=cls.region)
+        cls.items = [make_arxiv(cls.lookups, f"B-{i}", is_mutch=i % 2 == 0) for i in range(4)]
+        cls.other = make_arxiv(cls.lookups, "B-X")
+
+    def test_stats_and_search_stay_consistent(self):
+        qs = Arxiv.objects.filter(reg_num__startswith="B-").exclude(pk=self.other.pk)
+        updated = bulk_edit(qs, {"region": self.region, "district": self.district, "customer": "Yangi Buyurtmachi"})
+        self.assertEqual(updated, 4)
+
+        stored, expected = stat_counts()
+        self.assertEqual(stored, expected)
+        self.assertEqual(sum(c for key, c in stored.items() if key[0] == self.region.pk), 4)
+
+        found = set(search_arxiv(Arxiv.objects.all(), "yangi", "customer").values_list("pk", flat=True))
+        self.assertEqual(found, {a.pk for a in self.items})
+        found = set(search_arxiv(Arxiv.objects.all(), "Hokimiyat", "customer").values_list("pk", flat=True))
+        self.assertEqual(found, {self.other.pk})
+
+    def test_selection_ignores_bad_ids(self):
+        params = QueryDict(f"ids={self.other.pk}&ids=99999999999999999999&ids=²&ids=0&ids=-1")
+        self.assertEqual(list(bulk_selection(params)), [self.other])
+
+    def test_empty_selection(self):
+        self.assertEqual(bulk_edit(Arxiv.objects.none(), {"customer": "X"}), 0)
+        stored, expected = stat_counts()
+        self.assertEqual(stored, expected)
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("api", password="x")
+        cls.lookups = make_lookups()
+        with cls.captureOnCommitCallbacks(execute=True):
+            other_region = Region.objects.create(name="Buxoro")
+            cls.foreign_district = District.objects.create(name="Gijduvon", region=other_region)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def item(self, reg_num, **kwargs):
+        return {
+            "reg_num": reg_num, "reg_date": "2024-03-15", "customer": "Hokimiyat",
+            "prog": self.lookups["prog"].pk, "region": self.lookups["region"].pk,
+            "district": self.lookups["district"].pk, "object_type": self.lookups["object_type"].pk,
+            "object_name": "Maktab", "work_type": "Sinov", "signed_person": "A",
+            "branch_manager": "B", "specialist": "C", **kwargs,
+        }
+
+    def post(self, name, items):
+        return self.client.post(reverse(name), json.dumps({"items": items}), content_type="application/json")
+
+    def test_batch_create(self):
+        resp = self.post("api_arxiv_batch_create", [self.item("A-1"), self.item("A-2")])
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([r["reg_num"] for r in resp.json()["results"]], ["A-1", "A-2"])
+        stored, expected = stat_counts()
+        self.assertEqual(stored, expected)
+        self.assertEqual(sum(stored.values()), 2)
+
+    def test_batch_is_all_or_nothing(self):
+        resp = self.post("api_arxiv_batch_create", [
+            self.item("A-1"), self.item("A-2", district=self.foreign_district.pk), self.item("A-3", reg_date="x"),
+        ])
+        self.assertEqual(resp.status_code, 400)
+        errors = resp.json()["errors"]
+        self.assertEqual(sorted(errors), ["1", "2"])
+        self.assertIn("district", errors["1"])
+        self.assertIn("reg_date", errors["2"])
+
+        resp = self.post("api_arxiv_batch_create", [self.item("A-1"), self.item("A-1")])
+        self.assertEqual(resp.status_code, 409)
+        self.assertFalse(Arxiv.objects.exists())
+
+    def test_batch_shape(self):
+        url = reverse("api_arxiv_batch_create")
+        for body in ("not json", json.dumps([]), json.dumps({"items": [1]})):
+            with self.subTest(body=body):
+                resp = self.client.post(url, body, content_type="application/json")
+                self.assertEqual(resp.status_code, 400)
+        with mock.patch.object(api, "MAX_BATCH", 1):
+            resp = self.post("api_arxiv_batch_create", [self.item("A-1"), self.item("A-2")])
+        self.assertEqual(resp.status_code, 400)
+        self.assertFalse(Arxiv.objects.exists())
+
+    def test_batch_update(self):
+        a = make_arxiv(self.lookups, "U-1")
+        resp = self.post("api_arxiv_batch_update", [{"id": a.pk, "customer": "Yangi"}])
+        self.assertEqual(resp.status_code, 200)
+        a.refresh_from_db()
+        self.assertEqual((a.customer, a.object_name), ("Yangi", "Maktab binosi"))
+
+        resp = self.post("api_arxiv_batch_update", [
+            {"id": a.pk, "customer": "X"}, {"id": a.pk + 100}, {}, {"id": True}, {"id": 10**20}, {"id": "1"},
+        ])
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.json()["errors"], {
+            "1": "not found", "2": "invalid id", "3": "invalid id", "4": "invalid id", "5": "invalid id",
+        })
+        a.refresh_from_db()
+        self.assertEqual(a.customer, "Yangi")
+
+    def test_fields(self):
+        a = make_arxiv(self.lookups, "F-1")
+        resp = self.client.get(reverse("api_arxiv_detail", args=[a.pk]), {"fields": "reg_num,region"})
+        self.assertEqual(resp.json(), {
+            "id": a.pk, "reg_num": "F-1", "region": {"id": self.lookups["region"].pk, "name": "Toshkent"},
+        })
+        resp = self.client.get(reverse("api_arxiv_list"), {"fields": "reg_num,content"})
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("content", resp.json()["error"])
 
-# Create your tests here.
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse("api_arxiv_list")).status_code, 401)
+        self.assertEqual(self.post("api_arxiv_batch_create", [self.item("A-1")]).status_code, 401)
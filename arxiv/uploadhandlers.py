@@ -0,0 +1,24 @@
+import hashlib
+
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+
+class HashingFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Пишет загрузку сразу во временный файл (не в память) и по мере
+    поступления кусков считает sha256 — повторно файл читать не нужно.
+    Хэш доступен как uploaded_file.sha256.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hasher = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.sha256 = self.hasher.hexdigest()
+        return file
@@ -1,14 +1,33 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import api, views
+
+if settings.ARXIV_ASYNC_VIEWS:
+    # под ASGI PDF и районы отдают асинхронные версии
+    from . import async_views as pdf_views
+else:
+    pdf_views = views
 
 urlpatterns = [
     path("", views.arxiv_list, name="arxiv_list"),
     path("create/", views.arxiv_create, name="arxiv_create"),
-    path("pdf/<int:pdf_id>/view/", views.pdf_view, name="pdf_view"),
-    path("pdf/<int:pdf_id>/download/", views.pdf_download, name="pdf_download"),
+    path("bulk-edit/", views.arxiv_bulk_edit, name="arxiv_bulk_edit"),
+    path("export/", views.arxiv_export, name="arxiv_export"),
+    path("bundle/", views.arxiv_bundle, name="arxiv_bundle"),
+    path("stats/", views.arxiv_stats, name="arxiv_stats"),
+    path("stats/json/", views.arxiv_stats_json, name="arxiv_stats_json"),
+    path("pdf/<int:pdf_id>/view/", pdf_views.pdf_view, name="pdf_view"),
+    path("pdf/<int:pdf_id>/download/", pdf_views.pdf_download, name="pdf_download"),
     path("pdf/delete/<int:arxiv_id>/", views.pdf_delete, name="pdf_delete"),
     path("<int:pk>/edit/", views.arxiv_edit, name="arxiv_edit"),
     path("<int:pk>/delete/", views.arxiv_delete, name="arxiv_delete"),
-    path("ajax/districts/", views.districts_by_region, name="districts_by_region"),
+    path("ajax/districts/", pdf_views.districts_by_region, name="districts_by_region"),
+
+    # JSON API (arxiv/api.py)
+    path("api/arxiv/", api.arxiv_list, name="api_arxiv_list"),
+    path("api/arxiv/batch/", api.arxiv_batch_create, name="api_arxiv_batch_create"),
+    path("api/arxiv/batch/update/", api.arxiv_batch_update, name="api_arxiv_batch_update"),
+    path("api/arxiv/<int:pk>/", api.arxiv_detail, name="api_arxiv_detail"),
+    path("api/pdf/<int:pdf_id>/", api.pdf_detail, name="api_pdf_detail"),
 
 ]
@@ -1,17 +1,46 @@
 import hashlib
-from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse, Http404, JsonResponse
+
+from django.contrib.auth.decorators import login_required, permission_required
+from django.http import HttpResponse, Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect
 from django.shortcuts import get_object_or_404
-from urllib.parse import quote
-from .forms import ArxivForm
+from django.urls import reverse
+from .bundles import bundle_stream
+from .exports import XLSX_CONTENT_TYPE, csv_stream, export_rows, xlsx_stream
+from .bulk import bulk_edit
+from .forms import ArxivBulkForm, ArxivForm
+from .lookups import cached_objects, districts_for_region
+from .pagecache import cached_page, render_rows
+from .pagination import cached_count, paginate_keyset
+from .routing import read_db, replica_reads
+from .filters import filter_arxiv, list_ordering, parse_id
+from .stats import GROUPS, stat_filters, summary, total
+from .storage import save_pdf
+from .streaming import pdf_response
 from .models import PdfStorage
-from django.db.models import Q
 from .models import Arxiv
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
-from .models import District
-from django.core.paginator import Paginator
+from .models import District, ObjectType, Prog, Region
+from django.conf import settings
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+ARXIV_PAGE_SIZE = 10  # сколько записей на страницу
+# что можно выбрать в ?per_page= (широкие страницы строк из кэша почти не дороже узких)
+PAGE_SIZES = getattr(settings, "ARXIV_LIST_PAGE_SIZES", [10, 25, 50, 100])
+
+# варианты сортировки списка (см. filters.SORTS)
+SORT_CHOICES = [
+    ("", "По умолчанию"),
+    ("-reg_date", "Дата ↓"),
+    ("reg_date", "Дата ↑"),
+    ("customer", "Заказчик А→Я"),
+    ("-customer", "Заказчик Я→А"),
+    ("reg_num", "Рег. номер ↑"),
+    ("-reg_num", "Рег. номер ↓"),
+]
 
 @login_required
 def arxiv_create(request):
@@ -22,20 +51,7 @@ def arxiv_create(request):
 
             pdf_file = form.cleaned_data.get("pdf_file")
             if pdf_file:
-                data = pdf_file.read()
-                sha256 = hashlib.sha256(data).hexdigest()
-
-                pdf_obj, _ = PdfStorage.objects.get_or_create(
-                    sha256=sha256,
-                    defaults={
-                        "file_name": pdf_file.name,
-                        "mime_type": "application/pdf",
-                        "file_size": pdf_file.size,
-                        "content": data,
-                        "uploaded_by": request.user,
-                    },
-                )
-                arxiv.pdf = pdf_obj
+                arxiv.pdf = save_pdf(pdf_file, request.user)
 
             arxiv.save()
             return redirect("arxiv_list")
@@ -46,7 +62,7 @@ def arxiv_create(request):
 
 @login_required
 def arxiv_edit(request, pk: int):
-    arxiv = get_object_or_404(Arxiv, pk=pk)
+    arxiv = get_object_or_404(Arxiv.objects.with_pdf_meta(), pk=pk)
 
     if request.method == "POST":
         form = ArxivForm(request.POST, request.FILES, instance=arxiv)
@@ -55,20 +71,7 @@ def arxiv_edit(request, pk: int):
 
             pdf_file = form.cleaned_data.get("pdf_file")
             if pdf_file:
-                data = pdf_file.read()
-                sha256 = hashlib.sha256(data).hexdigest()
-
-                pdf_obj, _ = PdfStorage.objects.get_or_create(
-                    sha256=sha256,
-                    defaults={
-                        "file_name": pdf_file.name,
-                        "mime_type": "application/pdf",
-                        "file_size": pdf_file.size,
-                        "content": data,
-                        "uploaded_by": request.user,
-                    },
-                )
-                arxiv.pdf = pdf_obj
+                arxiv.pdf = save_pdf(pdf_file, request.user)
 
             arxiv.save()
             return redirect("arxiv_list")
@@ -77,6 +80,29 @@ def arxiv_edit(request, pk: int):
 
     return render(request, "arxiv/arxiv_form.html", {"form": form, "arxiv": arxiv})
 
+def bulk_selection(params):
+    # отмеченные в списке (ids) или вся выборка по фильтрам списка
+    ids = [pk for pk in map(parse_id, params.getlist("ids")) if pk is not None]
+    if ids:
+        return Arxiv.objects.filter(pk__in=ids)
+    qs, _ = filter_arxiv(Arxiv.objects.all(), params)
+    return qs
+
+@login_required
+@permission_required("arxiv.change_arxiv", raise_exception=True)
+def arxiv_bulk_edit(request):
+    qs = bulk_selection(request.GET)
+    form = ArxivBulkForm(request.POST or None, queryset=qs)
+
+    if request.method == "POST" and form.is_valid():
+        updated = bulk_edit(qs, form.changes())
+        messages.success(request, f"Изменено записей: {updated}.")
+        params = request.GET.copy()
+        params.pop("ids", None)
+        return redirect(f"{reverse('arxiv_list')}?{params.urlencode()}")
+
+    return render(request, "arxiv/arxiv_bulk_edit.html", {"form": form, "count": qs.count()})
+
 @login_required
 def arxiv_delete(request, pk: int):
     arxiv = get_object_or_404(Arxiv, pk=pk)
@@ -85,118 +111,158 @@ def arxiv_delete(request, pk: int):
         messages.warning(request, "Удаление нужно подтверждать.")
         return redirect("arxiv_list")
 
-    pdf = arxiv.pdf  # запоминаем связанный PDF
-
-    # 1) удаляем запись архива
+    # PDF отдельно не удаляем: если он больше ни к чему не привязан,
+    # его уберёт сборщик (arxiv/refs.py, задача pdf_gc / manage.py gc_pdfs)
     arxiv.delete()
 
-    # 2) удаляем PDF из PdfStorage (если есть)
-    if pdf:
-        try:
-            pdf.delete()
-        except ProtectedError:
-            # Значит этот pdf ещё используется другими записями Arxiv
-            messages.warning(
-                request,
-                "Запись удалена, но PDF не удалён, потому что он привязан к другим документам."
-            )
-            return redirect("arxiv_list")
-
-    messages.success(request, "Запись и PDF удалены.")
+    messages.success(request, "Запись удалена.")
     return redirect("arxiv_list")
 
 @login_required
+@replica_reads
 def pdf_view(request, pdf_id):
-    pdf = get_object_or_404(PdfStorage, id=pdf_id)
-
-    response = HttpResponse(
-        pdf.content,
-        content_type=pdf.mime_type or "application/pdf"
-    )
-
-    filename = pdf.file_name or "document.pdf"
-    response["Content-Disposition"] = (
-        f"inline; filename*=UTF-8''{quote(filename)}"
-    )
-    return response
+    # content не грузим — BLOB отдаётся кусками в pdf_response
+    pdf = get_object_or_404(PdfStorage.objects.metadata(), id=pdf_id)
+    return pdf_response(request, pdf, "inline")
 
 @staff_member_required
 def pdf_delete(request, arxiv_id):
     arxiv = get_object_or_404(Arxiv, id=arxiv_id)
 
-    if not arxiv.pdf:
+    if not arxiv.pdf_id:
         messages.warning(request, "PDF файл отсутствует.")
         return redirect("arxiv_list")
 
-    pdf = arxiv.pdf
+    # отвязываем; сам файл удалит сборщик, если на него не ссылаются другие записи
     arxiv.pdf = None
     arxiv.save()
 
-    pdf.delete()  # удаляем PDF из PdfStorage
-
-    messages.success(request, "PDF файл удалён.")
+    messages.success(request, "PDF файл удалён из записи.")
     return redirect("arxiv_list")
 
 @login_required
+@replica_reads
 def pdf_download(request, pdf_id: int):
-    pdf = get_object_or_404(PdfStorage, id=pdf_id)
+    pdf = get_object_or_404(PdfStorage.objects.metadata(), id=pdf_id)
 
     # Отдаём PDF с корректным именем (русское имя тоже норм)
-    resp = HttpResponse(pdf.content, content_type=pdf.mime_type or "application/pdf")
-    filename = pdf.file_name or "document.pdf"
-    resp["Content-Disposition"] = f"attachment; filename*=UTF-8''{filename}"
-    return resp
+    return pdf_response(request, pdf, "attachment")
 
 @login_required
+@replica_reads
 def arxiv_list(request):
-    q = request.GET.get("q", "").strip()
-    field = request.GET.get("field", "all")  # all | reg_num | customer | object_name | book_number
-    page_number = request.GET.get("page", 1)
-
-    qs = Arxiv.objects.all().prefetch_related("prog", "region", "district", "object_type", "pdf").order_by("-id")
-
-    # список разрешённых полей для поиска (чтобы не было “инъекций” через GET)
-    allowed_fields = {"all", "reg_num", "customer", "object_name", "book_number"}
-    if field not in allowed_fields:
-        field = "all"
-
-    if q:
-        if field == "all":
-            qs = qs.filter(
-                Q(reg_num__icontains=q) |
-                Q(customer__icontains=q) |
-                Q(object_name__icontains=q) |
-                Q(book_number__icontains=q)
-            )
-        else:
-            qs = qs.filter(**{f"{field}__icontains": q})
-
-    # можно добавить сортировку
-    qs = qs.order_by("-id")
-
-    paginator = Paginator(qs, 10)  # <-- сколько записей на страницу
-    page_obj = paginator.get_page(page_number)
+    # одинаковые страницы (первые, популярные поиски) отдаются из кэша, см. arxiv/pagecache.py
+    return cached_page(request, "arxiv/arxiv_list.html", lambda: arxiv_list_context(request))
+
+def arxiv_list_context(request):
+    cursor = request.GET.get("cursor")
+
+    qs = (
+        Arxiv.objects
+        .select_related("prog", "region", "district", "object_type")
+        .with_pdf_meta()
+    )
+    qs, filters = filter_arxiv(qs, request.GET)
+
+    # сравниваем строки: "²".isdigit() истинно, а int("²") — ошибка
+    sizes = {str(n): n for n in PAGE_SIZES}
+    per_page = sizes.get(request.GET.get("per_page", ""), ARXIV_PAGE_SIZE)
+
+    # keyset-пагинация: без COUNT(*) и OFFSET, глубокие страницы не тормозят
+    page_obj = paginate_keyset(qs, list_ordering(qs, filters), cursor, per_page)
+
+    total = None
+    if getattr(settings, "ARXIV_LIST_SHOW_TOTAL", True):
+        total = cached_count(qs, sorted(filters.items()))
 
     # чтобы при клике Next/Prev сохранялись q и field
     params = request.GET.copy()
-    if "page" in params:
-        params.pop("page")
+    for key in ("page", "cursor"):
+        params.pop(key, None)
     base_qs = params.urlencode()
 
-    return render(request, "arxiv/arxiv_list.html", {
+    return {
         "page_obj": page_obj,   # пагинация
         "items": page_obj.object_list,  # если в шаблоне уже используется items
-        "q": q,
-        "field": field,
+        "rows_html": render_rows(page_obj.object_list),
+        **filters,
         "base_qs": base_qs,
+        "total": total,
+        "total_pages": -(-total // per_page) if total else None,
+        "per_page": per_page,
+        "page_sizes": PAGE_SIZES,
+        # справочники для фильтров — из кэша, без запросов
+        "regions": cached_objects(Region),
+        "districts": districts_for_region(filters["region"]) if filters["region"] else [],
+        "progs": cached_objects(Prog),
+        "object_types": cached_objects(ObjectType),
+        "sort_choices": SORT_CHOICES,
+    }
+
+@login_required
+@replica_reads
+def arxiv_export(request):
+    # те же q/field, что и в списке; файл собирается потоком, без загрузки всей выборки.
+    # Поток читается уже после выхода из view — БД указываем явно
+    qs, _ = filter_arxiv(Arxiv.objects.using(read_db()), request.GET)
+    rows = export_rows(qs)
+    stamp = timezone.localdate().strftime("%Y%m%d")
+
+    if request.GET.get("format") == "xlsx":
+        resp = StreamingHttpResponse(xlsx_stream(rows), content_type=XLSX_CONTENT_TYPE)
+        filename = f"arxiv_{stamp}.xlsx"
+    else:
+        resp = StreamingHttpResponse(csv_stream(rows), content_type="text/csv; charset=utf-8")
+        filename = f"arxiv_{stamp}.csv"
+    resp["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return resp
+
+@login_required
+@replica_reads
+def arxiv_bundle(request):
+    # ZIP со всеми PDF текущей выборки списка и manifest.csv
+    qs, _ = filter_arxiv(Arxiv.objects.using(read_db()), request.GET)
+    stamp = timezone.localdate().strftime("%Y%m%d")
+    resp = StreamingHttpResponse(bundle_stream(qs), content_type="application/zip")
+    resp["Content-Disposition"] = f'attachment; filename="arxiv_pdf_{stamp}.zip"'
+    return resp
+
+@login_required
+@replica_reads
+def arxiv_stats(request):
+    # всё из сводной таблицы arxiv_stat — без GROUP BY по arxiv
+    filters = stat_filters(request.GET)
+    return render(request, "arxiv/arxiv_stats.html", {
+        "total": total(filters),
+        "groups": [(name, summary(name, filters)) for name in GROUPS],
+        "regions": cached_objects(Region),
+        "params": request.GET,
     })
 
 @login_required
+@replica_reads
+def arxiv_stats_json(request):
+    group = request.GET.get("group", "region")
+    if group not in GROUPS:
+        return JsonResponse({"error": f"group: {', '.join(GROUPS)}"}, status=400)
+    filters = stat_filters(request.GET)
+    return JsonResponse({"group": group, "total": total(filters), "results": summary(group, filters)})
+
+def districts_response(request, districts):
+    # ETag — хэш самого ответа: версия справочника в CACHES у воркеров с LocMemCache
+    # разная, и по ней 304 мог подтвердить клиенту устаревший список районов
+    resp = JsonResponse({"results": [{"id": d.id, "name": d.name} for d in districts]})
+    resp["ETag"] = quote_etag(hashlib.md5(resp.content).hexdigest())
+    resp["Cache-Control"] = "private, no-cache"
+    return get_conditional_response(request, etag=resp["ETag"], response=resp)
+
+
+@login_required
+@replica_reads
 def districts_by_region(request):
     region_id = request.GET.get("region_id")
-    if not region_id:
-        return JsonResponse({"results": []})
-
-    qs = District.objects.filter(region_id=region_id).order_by("name")
-    data = [{"id": d.id, "name": d.name} for d in qs]
-    return JsonResponse({"results": data})
\ No newline at end of file
+    try:
+        region_id = int(region_id)
+    except (TypeError, ValueError):
+        return districts_response(request, [])
+    return districts_response(request, districts_for_region(region_id))
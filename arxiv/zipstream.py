@@ -0,0 +1,35 @@
+"""
+Потоковая запись ZIP: zipfile пишет в этот буфер, а мы сразу отдаём
+накопленные байты в StreamingHttpResponse. seek() нет — zipfile сам
+переходит в режим "без перемотки" (data descriptor после каждого файла).
+"""
+
+
+class StreamBuffer:
+    def __init__(self):
+        self._chunks = []
+        self._size = 0
+        self._pos = 0
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._size += len(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def flush(self):
+        pass
+
+    @property
+    def pending(self):
+        return self._size
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        self._size = 0
+        return data
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysite.settings')
+# PDF и справочники — асинхронными view (uvicorn mysite.asgi:application)
+os.environ.setdefault('ARXIV_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,6 +43,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'arxiv.metrics.MetricsMiddleware',  # первым — чтобы мерить весь запрос
+    'arxiv.routing.ReplicaMiddleware',  # до сессий: их запись тоже считается записью
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -57,13 +60,20 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         "DIRS": [BASE_DIR / "templates"],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # шаблоны компилируются один раз на процесс (и при DEBUG тоже);
+            # runserver сбрасывает этот кэш при правке шаблона, на сервере — перезапуск
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -90,6 +100,19 @@ DATABASES = {
     }
 }
 
+# Реплики только для чтения (arxiv/routing.py): на них уходят список, поиск,
+# выгрузки и отдача PDF; запись и чтение сразу после записи — в default.
+#   DATABASES['replica1'] = {**DATABASES['default'], 'HOST': '10.0.0.12', 'TEST': {'MIRROR': 'default'}}
+#   ARXIV_DB_REPLICAS = ['replica1']
+# Проверить локально на двух SQLite: default и replica с ENGINE sqlite3,
+# migrate, затем скопировать файл default в файл replica ("репликация").
+DATABASE_ROUTERS = ['arxiv.routing.ReplicaRouter']
+ARXIV_DB_REPLICAS = []
+# сколько секунд после записи пользователь читает только с primary
+ARXIV_DB_STICKY_SECONDS = 10
+# страницы списка, собранные с реплики, кэшируются не дольше (сек)
+ARXIV_LIST_CACHE_REPLICA_TTL = 30
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -128,4 +151,84 @@ STATIC_URL = 'static/'
 
 LOGIN_URL = '/accounts/login/'
 LOGIN_REDIRECT_URL = '/'       # куда после входа
-LOGOUT_REDIRECT_URL = '/'  
\ No newline at end of file
+LOGOUT_REDIRECT_URL = '/'  
+
+# Arxiv: PDF отдаётся из PdfStorage кусками такого размера (байты)
+ARXIV_PDF_CHUNK_SIZE = 512 * 1024
+
+# Где хранить новые PDF: "db" — LONGBLOB в pdf_storage, "fs" — файлы в ARXIV_PDF_ROOT
+# Перенос старых BLOB на диск: python manage.py move_pdfs_to_fs
+ARXIV_PDF_STORAGE = "db"
+ARXIV_PDF_ROOT = BASE_DIR / "pdf_store"
+
+# Кэширование PDF (ETag = sha256). "private" — только браузер; если перед сайтом
+# стоит свой reverse proxy с проверкой доступа, можно поставить "public, ..."
+ARXIV_PDF_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+# Загрузки сразу пишутся во временный файл, sha256 считается по ходу приёма
+FILE_UPLOAD_HANDLERS = ["arxiv.uploadhandlers.HashingFileUploadHandler"]
+
+# Кэш Django. По умолчанию — LocMemCache, свой у каждого процесса; кэш страниц списка
+# и версии справочников требуют общего кэша на все воркеры, например:
+# CACHES = {
+#     "default": {
+#         "BACKEND": "django.core.cache.backends.redis.RedisCache",  # pip install redis
+#         "LOCATION": os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/1"),
+#     }
+# }
+
+# Список архива: показывать "≈ N записей" (COUNT кэшируется на ARXIV_LIST_COUNT_TTL секунд)
+ARXIV_LIST_SHOW_TOTAL = True
+ARXIV_LIST_COUNT_TTL = 300
+
+# Справочники (Prog/Region/District/ObjectType) кэшируются в памяти процесса.
+# Версия хранится в CACHES — для нескольких воркеров нужен общий кэш (memcached/redis),
+# иначе чужие изменения подхватятся не позже чем через ARXIV_LOOKUP_TTL секунд.
+ARXIV_LOOKUP_TTL = 60
+
+# Асинхронные pdf_view/pdf_download/districts_by_region (arxiv/async_views.py).
+# Включается автоматически в mysite/asgi.py — под WSGI должно быть выключено.
+ARXIV_ASYNC_VIEWS = os.environ.get("ARXIV_ASYNC_VIEWS") == "1"
+
+# JSON API (arxiv/api.py): размер страницы по умолчанию/максимум и записей в одной пачке
+ARXIV_API_PAGE_SIZE = 50
+ARXIV_API_MAX_PAGE_SIZE = 500
+ARXIV_API_MAX_BATCH = 500
+
+# Готовые страницы arxiv_list кэшируются до любого изменения архива (arxiv/pagecache.py);
+# 0 — выключить. Нужен общий для всех воркеров CACHES (см. CACHES выше): с LocMemCache
+# (по умолчанию) кэш страниц не работает — сброс в одном процессе не виден другим.
+ARXIV_LIST_CACHE_TTL = 600
+
+# Метрики запросов (arxiv/metrics.py): заголовок Server-Timing и /metrics для Prometheus.
+# /metrics доступен staff и Prometheus с заголовком "Authorization: Bearer <ARXIV_METRICS_TOKEN>"
+# (пустой токен — только staff). ARXIV_METRICS_ALLOWED_IPS — только если REMOTE_ADDR
+# настоящий адрес клиента: за nginx на том же сервере это 127.0.0.1 для всех.
+ARXIV_METRICS_SERVER_TIMING = True
+ARXIV_METRICS_TOKEN = os.environ.get("ARXIV_METRICS_TOKEN", "")
+ARXIV_METRICS_ALLOWED_IPS = []
+
+# Сжатие PDF в pdf_storage.content (arxiv/compression.py): кодеки-кандидаты ("zlib", "lzma"),
+# [] — не сжимать. Сжатый вариант хранится, только если меньше исходного хотя бы на 5%.
+# Цена: сжатые PDF отдаются без Range (Accept-Ranges: none) — просмотрщик грузит файл
+# целиком, прерванное скачивание начинается заново. Поэтому по умолчанию выключено;
+# включайте, если место в БД важнее. Старые записи: python manage.py compress_pdfs
+ARXIV_PDF_CODECS = []
+ARXIV_PDF_COMPRESS_MIN_SAVING = 0.05
+
+# PDF, на которые больше не ссылается ни одна запись, удаляются через столько секунд
+# (задача pdf_gc в run_jobs; полный проход — python manage.py gc_pdfs)
+ARXIV_PDF_GC_GRACE = 3600
+
+# массовое изменение (список и admin): больше записей за раз не меняем
+ARXIV_BULK_EDIT_MAX = 5000
+
+# admin Arxiv/PdfStorage: точный COUNT для страниц, но не больше стольких строк
+# (дальше — фильтр или поиск)
+ARXIV_ADMIN_COUNT_MAX = 10000
+
+# готовые строки таблицы списка (ключ — id + updated_at записи), сек; 0 — не кэшировать
+# с LocMemCache (не общий CACHES) — не дольше ARXIV_LOOKUP_TTL
+ARXIV_LIST_ROW_CACHE_TTL = 24 * 3600
+# варианты ?per_page= на странице списка
+ARXIV_LIST_PAGE_SIZES = [10, 25, 50, 100]
@@ -17,9 +17,12 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from arxiv.metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('accounts/', include('django.contrib.auth.urls')),  # login/logout
     path("arxiv/", include("arxiv.urls")),
+    path("metrics", metrics_view, name="metrics"),            # Prometheus
     path('', include('main.urls')),                           # сайт
 ]
\ No newline at end of file